@@ -2,26 +2,42 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import hmac
 import logging
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from prometheus_client import CONTENT_TYPE_LATEST
 from datetime import timedelta
 from models import db, Event, User # Imported for Flask-Migrate
 from auth import auth_bp
 from events import events_bp
 from tickets import tickets_bp
 from eventbrite import eventbrite_bp
+from waiting_room import waiting_room_bp
+from commands import register_commands
+from services.waiting_room_service import waiting_room
+from services.idempotency_service import idempotency
+from services.availability_service import availability
+from services.matching_service import matching
+from services.instrumentation_service import instrumentation
+from services.metrics_service import metrics
+from services.profiler_service import profiler
+from services.response_cache_service import response_cache
+from services.json_provider import OrjsonProvider
+from werkzeug.utils import import_string
 
 from config import DevelopmentConfig, ProductionConfig, TestingConfig
 
-def create_app():
+def create_app(config_class=None):
     app = Flask(__name__)
 
     env = os.environ.get('FLASK_ENV', 'development')
-    if env == 'production':
+    if config_class is not None:
+        app.config.from_object(config_class)
+    elif env == 'production':
         app.config.from_object(ProductionConfig)
     elif env == 'testing':
         app.config.from_object(TestingConfig)
@@ -40,16 +56,30 @@ def create_app():
     
     CORS(app, resources={r"/*": {"origins": "*"}})
 
+    json_provider = app.config.get('JSON_PROVIDER') or OrjsonProvider
+    app.json = (import_string(json_provider) if isinstance(json_provider, str) else json_provider)(app)
+
     # Initialize extensions
     db.init_app(app)
     Migrate(app, db)
     JWTManager(app)
+    waiting_room.init_app(app)
+    idempotency.init_app(app)
+    availability.init_app(app)
+    matching.init_app(app)
+    instrumentation.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    response_cache.init_app(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(events_bp, url_prefix='/events')
     app.register_blueprint(tickets_bp, url_prefix='/tickets')
     app.register_blueprint(eventbrite_bp, url_prefix='/eventbrite')
+    app.register_blueprint(waiting_room_bp, url_prefix='/waiting-room')
+
+    register_commands(app)
 
     # Error handlers
     @app.errorhandler(404)
@@ -61,6 +91,15 @@ def create_app():
         app.logger.error(f'Internal server error: {error}')
         return jsonify({'error': 'Internal server error'}), 500
 
+    @app.route('/metrics')
+    def prometheus_metrics():
+        token = app.config.get('METRICS_AUTH_TOKEN')
+        if not token and app.config.get('METRICS_AUTH_REQUIRED'):
+            return jsonify({'error': 'Metrics are disabled until METRICS_AUTH_TOKEN is set'}), 403
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return metrics.render(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
     @app.route('/uploads/<filename>')#for uploading profile pics
     def uploaded_file(filename):
         return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
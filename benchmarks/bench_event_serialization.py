@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: serializing an event listing.
+
+Compares the ORM path (load Event instances, Event.to_dict(), stdlib
+jsonify) with the projection path used by read-only listings (select the
+columns, Event.row_serializer(), OrjsonProvider) on an in-memory SQLite
+database.
+
+    python benchmarks/bench_event_serialization.py [--events 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from config import TestingConfig
+from models import db, Event, User
+from services.json_provider import OrjsonProvider, orjson
+
+
+def seed(count):
+    organizer = User(username='organizer', email='org@bench.test', password='password')
+    db.session.add(organizer)
+    db.session.commit()
+
+    start = datetime.utcnow() + timedelta(days=1)
+    db.session.bulk_insert_mappings(Event, [{
+        'name': f'Event {i}', 'location': 'Kenyatta International Convention Centre, Nairobi',
+        'description': 'An evening of live music, food stalls and local artists. ' * 6,
+        'date': start + timedelta(hours=i), 'price': 1500.0, 'image': f'https://img.example.com/{i}.jpg',
+        'capacity': 500, 'tickets_sold': i % 500, 'status': 'upcoming', 'category': 'Music',
+        'created_at': datetime.utcnow(), 'user_id': organizer.id
+    } for i in range(count)])
+    db.session.commit()
+
+
+def orm_path(app, fields=None):
+    events = Event.query.all()
+    return DefaultJSONProvider(app).response({'events': [event.to_dict(fields) for event in events]}).get_data()
+
+
+def projection_path(app, fields=None):
+    serialize = Event.row_serializer(fields)
+    rows = db.session.query(*Event.projection(fields)).all()
+    return OrjsonProvider(app).response({'events': [serialize(row) for row in rows]}).get_data()
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()  # measure instance loading, not identity map hits
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        seed(args.events)
+
+        print(f'{args.events} events, best of {args.repeat}, orjson {"installed" if orjson else "missing (stdlib fallback)"}')
+        cases = [
+            ('to_dict + stdlib jsonify', lambda: orm_path(app)),
+            ('projection + OrjsonProvider', lambda: projection_path(app)),
+            ('to_dict(card) + stdlib jsonify', lambda: orm_path(app, Event.FIELD_SETS['card'])),
+            ('projection(card) + OrjsonProvider', lambda: projection_path(app, Event.FIELD_SETS['card'])),
+        ]
+        baseline = None
+        for name, fn in cases:
+            seconds, size = best_of(args.repeat, fn)
+            baseline = baseline or seconds
+            print(f'{name:36} {seconds * 1000:8.1f} ms  {baseline / seconds:5.1f}x  {size / 1024:8.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Flask CLI maintenance commands (`flask <command>`).
+"""
+
+import os
+import click
+
+
+def register_commands(app):
+    @app.cli.command('reap-reservations')
+    @click.option('--batch-size', default=500, show_default=True, help='Holds expired per transaction.')
+    @click.option('--interval', type=float, help='Keep running, reaping every INTERVAL seconds.')
+    def reap_reservations(batch_size, interval):
+        """Return expired reservation holds to inventory."""
+        import time
+        from models import db
+        from services.reservation_service import expire_reservations
+
+        while True:
+            try:
+                expired = expire_reservations(batch_size)
+                click.echo(f'Expired {expired} reservation(s)')
+            except Exception as e:
+                if not interval:
+                    raise
+                # Leave the failed transaction so the next run starts clean
+                db.session.rollback()
+                app.logger.error(f'Reservation reaper failed: {e}')
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @app.cli.command('purge-idempotency-keys')
+    def purge_idempotency_keys():
+        """Delete expired keys from the shared idempotency store."""
+        from services.idempotency_service import purge_expired_keys
+
+        click.echo(f'Purged {purge_expired_keys()} expired idempotency key(s)')
+
+    @app.cli.command('reconcile-counters')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Event ids aggregated per query.')
+    @click.option('--incremental', is_flag=True, help='Only check events touched since the last run.')
+    @click.option('--dry-run', is_flag=True, help='Report drift without repairing it.')
+    def reconcile_counters(chunk_size, incremental, dry_run):
+        """Recompute event ticket counters and repair drift."""
+        from services.reconciliation_service import reconcile_counters as reconcile
+
+        report = reconcile(chunk_size=chunk_size, incremental=incremental, repair=not dry_run)
+        for drift in report['drifted']:
+            changes = ', '.join(
+                f"{name} {values['stored']} -> {values['actual']}"
+                for name, values in drift.items() if name != 'event_id'
+            )
+            click.echo(f"Event {drift['event_id']}: {changes}")
+        for event_id in report['oversold']:
+            click.echo(f'Event {event_id}: more seats sold and held than capacity')
+
+        action = 'Found' if dry_run else 'Repaired'
+        click.echo(f"Checked {report['events_checked']} event(s). {action} drift in {len(report['drifted'])}.")
+
+    @app.cli.command('match-resale')
+    @click.option('--event-id', type=int, help='Only match this event.')
+    @click.option('--batch-size', default=100, show_default=True, help='Trades written per transaction.')
+    def match_resale(event_id, batch_size):
+        """Match resale buy orders against listings."""
+        from datetime import datetime
+        from models import db, BuyOrder, Event
+        from services.matching_service import matching
+
+        if event_id is not None:
+            event_ids = [event_id]
+        else:
+            # Past events cannot trade, however many bids are still open
+            event_ids = [row[0] for row in db.session.query(BuyOrder.event_id).join(
+                Event, Event.id == BuyOrder.event_id
+            ).filter(BuyOrder.status == 'open', Event.date > datetime.utcnow()).distinct()]
+
+        trades = 0
+        for event_id in event_ids:
+            trades += matching.match(event_id, batch_size)
+        click.echo(f'Executed {trades} resale trade(s) across {len(event_ids)} event(s)')
+
+    @app.cli.command('rebuild-resale-stats')
+    @click.option('--event-id', type=int, help='Only rebuild this event.')
+    def rebuild_resale_stats(event_id):
+        """Recompute resale price levels from the listed tickets."""
+        from services.resale_stats_service import rebuild_price_levels
+
+        levels = rebuild_price_levels(event_id)
+        click.echo(f'Rebuilt {levels} resale price level(s)')
+
+    @app.cli.command('profile-token')
+    @click.option('--ttl', default=600, show_default=True, help='Seconds the token stays valid.')
+    def profile_token(ttl):
+        """Print an X-Profile header value that enables profiling for a request."""
+        import time
+        from services.profiler_service import sign_token, PROFILE_HEADER
+
+        secret = app.config.get('PROFILER_SECRET')
+        if not secret:
+            raise click.ClickException('PROFILER_SECRET is not set')
+        click.echo(f'{PROFILE_HEADER}: {sign_token(secret, time.time() + ttl)}')
+
+    @app.cli.command('profile-summary')
+    @click.option('--limit', default=20, show_default=True, help='Frames to show.')
+    @click.option('--dir', 'directory', help='Profile directory (default: PROFILER_DIR).')
+    def profile_summary(limit, directory):
+        """Summarize the top frames across captured profiles."""
+        from services.profiler_service import summarize
+
+        directory = directory or app.config.get('PROFILER_DIR')
+        if not directory or not os.path.isdir(directory):
+            raise click.ClickException('No profile directory; set PROFILER_DIR or pass --dir')
+
+        cprofile_rows, sampled_rows = summarize(directory, limit)
+        if cprofile_rows:
+            click.echo(f'{"cumulative s":>12} {"total s":>9} {"calls":>8}  function')
+            for function, calls, total, cumulative in cprofile_rows:
+                click.echo(f'{cumulative:12.4f} {total:9.4f} {calls:8d}  {function}')
+        if sampled_rows:
+            click.echo(f'{"on stack":>9} {"leaf":>7}  frame')
+            for frame, leaf, samples in sampled_rows:
+                click.echo(f'{samples:9d} {leaf:7d}  {frame}')
+        if not cprofile_rows and not sampled_rows:
+            click.echo('No profiles captured')
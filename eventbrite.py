@@ -5,6 +5,7 @@ Provides access to Eventbrite events data
 
 from flask import Blueprint, jsonify, request
 from services.eventbrite_service import eventbrite_service
+from services.search_service import search_events
 
 eventbrite_bp = Blueprint('eventbrite', __name__)
 
@@ -102,10 +103,7 @@ def get_mixed_events():
     local_query = LocalEvent.query
     
     if search:
-        local_query = local_query.filter(
-            LocalEvent.name.ilike(f'%{search}%') |
-            LocalEvent.description.ilike(f'%{search}%')
-        )
+        local_query = search_events(local_query, search, rank=False)
     
     if category:
         local_query = local_query.filter_by(category=category)
@@ -1,12 +1,18 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.orm import load_only
 from models import db, Event, Ticket, User
-from sqlalchemy import or_
+from services.search_service import search_events
+from services.pagination import keyset_paginate, InvalidCursor
+from services.response_cache_service import cached_response
+from services.etag_service import conditional, conditional_page, load_event_version
 from services.event_service import create_event as create_event_service, update_event as update_event_service, delete_event as delete_event_service
 
 events_bp = Blueprint('events', __name__)
 
+MAX_EVENTS_PAGE = 100
+
 def is_valid_date(date_str): #helper function to check if the date is after now
     try:
         date = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
@@ -14,10 +20,38 @@ def is_valid_date(date_str): #helper function to check if the date is after now
     except ValueError:
         return False
 
-@events_bp.route('/', methods=['GET'])
-def get_events():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+def requested_fields():
+    """
+    Event fields named by the `fields` query parameter: a field set from
+    Event.FIELD_SETS (e.g. `card`) or a comma-separated list of fields.
+
+    Returns:
+        Tuple of field names, or None for every field
+
+    Raises:
+        ValueError: if a field is unknown
+    """
+    value = request.args.get('fields')
+    if not value:
+        return None
+    if value in Event.FIELD_SETS:
+        return Event.FIELD_SETS[value]
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in Event.SERIALIZED_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}' if unknown else 'fields is empty')
+    return fields
+
+def load_fields(query, fields):
+    """Restrict an Event query to the columns `fields` serialize from."""
+    if fields is None:
+        return query
+    return query.options(load_only(*(getattr(Event, field) for field in fields)))
+
+def filtered_events():
+    """Event query for the listing filters in the request's query string."""
+    cursor = request.args.get('cursor')
     search = request.args.get('search', '')
     status = request.args.get('status', 'upcoming')
     start_date = request.args.get('start_date')
@@ -27,13 +61,8 @@ def get_events():
     query = Event.query
     
     if search:
-        query = query.filter(
-            or_(
-                Event.name.ilike(f'%{search}%'),
-                Event.description.ilike(f'%{search}%'),
-                Event.location.ilike(f'%{search}%')
-            )
-        )
+        # Keyset pages need a stable (date, id) order, so only rank in offset mode
+        query = search_events(query, search, rank=cursor is None)
     
     if status:
         query = query.filter(Event.status == status)
@@ -46,12 +75,55 @@ def get_events():
 
     if category:
         query = query.filter(Event.category == category)
+
+    return query
+
+@events_bp.route('/', methods=['GET'])
+@cached_response(lambda: ['events'])
+@conditional_page
+def get_events():
+    """
+    List events.
+
+    Offset mode (default) returns `total_pages`. Passing `cursor` (empty for
+    the first page) switches to keyset mode: results are ordered by
+    (date, id) and each page returns a `next_cursor` instead of counts.
+    `per_page` is clamped to 1..100.
+
+    `fields` limits each event to the named fields, or to a predefined set
+    such as `card` (id, name, date, image, price); only those columns are
+    selected. Rows are serialized directly, without loading Event instances.
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_EVENTS_PAGE)
+    cursor = request.args.get('cursor')
+    try:
+        fields = requested_fields()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = filtered_events()
+    serialize = Event.row_serializer(fields)
+
+    if cursor is not None:
+        # The cursor is built from the last row's (date, id), so select them even if not requested
+        cursor_columns = [column for column in (Event.date, Event.id) if column.key not in (fields or Event.SERIALIZED_FIELDS)]
+        try:
+            rows, next_cursor = keyset_paginate(
+                query.with_entities(*Event.projection(fields), *cursor_columns), [Event.date, Event.id], cursor, per_page
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+        return jsonify({
+            'events': [serialize(row) for row in rows],
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }), 200
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    events = pagination.items
+    pagination = query.with_entities(*Event.projection(fields)).paginate(page=page, per_page=per_page, error_out=False)
     
     return jsonify({
-        'events': [event.to_dict() for event in events],
+        'events': [serialize(row) for row in pagination.items],
         'total_pages': pagination.pages,
         'current_page': pagination.page,
         'has_next': pagination.has_next,
@@ -59,9 +131,17 @@ def get_events():
     }), 200
 
 @events_bp.route('/<int:event_id>', methods=['GET'])
+@cached_response(lambda event_id: [f'event:{event_id}'])
+@conditional(load_event_version)
 def get_event(event_id):
-    event = Event.query.get_or_404(event_id)
-    return jsonify(event.to_dict()), 200
+    """Get one event; takes the same `fields` parameter as the listing."""
+    try:
+        fields = requested_fields()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    event = load_fields(Event.query, fields).get_or_404(event_id)
+    return jsonify(event.to_dict(fields)), 200
 
 
 ########################################
@@ -97,7 +177,7 @@ def update_event(event_id):
     event = Event.query.get_or_404(event_id)
 
     # Check if user owns the event
-    if event.user_id != current_user_.id:
+    if event.user_id != current_user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
     data = request.get_json()
@@ -131,6 +211,7 @@ def delete_event(event_id):
 @jwt_required()
 def get_my_events():
     current_user_id = get_jwt_identity()
-    events = Event.query.filter_by(user_id=current_user_id).all()
-    return jsonify([event.to_dict() for event in events]), 200 
+    rows = db.session.query(*Event.projection()).filter(Event.user_id == current_user_id).all()
+    serialize = Event.row_serializer()
+    return jsonify([serialize(row) for row in rows]), 200 
 
@@ -0,0 +1,37 @@
+"""
+gunicorn settings, picked up automatically by `gunicorn app:app`.
+
+Keeps prometheus_client's multiprocess directory (PROMETHEUS_MULTIPROC_DIR,
+see services/metrics_service.py) consistent across worker restarts, and
+refuses to run several workers with the in-process waiting room.
+"""
+
+import glob
+import os
+
+
+def on_starting(server):
+    # Samples left by a previous run would be counted again
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Per-process queues would admit `rate` buyers per worker and reject each other's tokens
+    if worker.cfg.workers > 1:
+        from services.waiting_room_service import LocalWaitingRoomBackend
+        backend = getattr(worker.wsgi, 'extensions', {}).get('waiting_room')
+        if isinstance(backend, LocalWaitingRoomBackend):
+            raise RuntimeError(
+                f'LocalWaitingRoomBackend cannot be shared by {worker.cfg.workers} workers; '
+                'set WAITING_ROOM_BACKEND to a shared backend'
+            )
@@ -0,0 +1,76 @@
+"""Add full-text search index to events
+
+Revision ID: 3f9c2a7d5e41
+Revises: 01e762918f6f
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d5e41'
+down_revision = '01e762918f6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # A stored generated column is filled for every existing row when it
+        # is added, so this also backfills the catalogue.
+        op.execute("""
+            ALTER TABLE events ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            ) STORED
+        """)
+        op.execute('CREATE INDEX ix_events_search_vector ON events USING GIN (search_vector)')
+
+    elif dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE events_fts USING fts5(
+                name, description, location, content='events', content_rowid='id'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN
+                INSERT INTO events_fts(rowid, name, description, location)
+                VALUES (new.id, new.name, new.description, new.location);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER events_fts_ad AFTER DELETE ON events BEGIN
+                INSERT INTO events_fts(events_fts, rowid, name, description, location)
+                VALUES ('delete', old.id, old.name, old.description, old.location);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER events_fts_au AFTER UPDATE OF name, description, location ON events BEGIN
+                INSERT INTO events_fts(events_fts, rowid, name, description, location)
+                VALUES ('delete', old.id, old.name, old.description, old.location);
+                INSERT INTO events_fts(rowid, name, description, location)
+                VALUES (new.id, new.name, new.description, new.location);
+            END
+        """)
+        # Backfill the index from the existing events rows
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_events_search_vector')
+        op.execute('ALTER TABLE events DROP COLUMN IF EXISTS search_vector')
+
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS events_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS events_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS events_fts_ai')
+        op.execute('DROP TABLE IF EXISTS events_fts')
@@ -0,0 +1,41 @@
+"""Add events.updated_at and reconciliation run log
+
+Revision ID: a6b2e4f9c3d8
+Revises: f5c1d9e8a7b2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6b2e4f9c3d8'
+down_revision = 'f5c1d9e8a7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE events SET updated_at = created_at')
+    op.create_index('ix_events_updated_at', 'events', ['updated_at'])
+
+    op.create_table('reconciliation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('incremental', sa.Boolean(), nullable=True),
+        sa.Column('repaired', sa.Boolean(), nullable=True),
+        sa.Column('events_checked', sa.Integer(), nullable=True),
+        sa.Column('events_drifted', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('reconciliation_runs')
+    op.drop_index('ix_events_updated_at', table_name='events')
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,27 @@
+"""Index resale listings by price for the order book
+
+Revision ID: b3d7f1a9e5c2
+Revises: a6b2e4f9c3d8
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d7f1a9e5c2'
+down_revision = 'a6b2e4f9c3d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (event_id, status) is a prefix of the new index, so the old one is redundant
+    op.create_index('ix_tickets_event_status_resale_price', 'tickets', ['event_id', 'status', 'resale_price'])
+    op.drop_index('ix_tickets_event_status', table_name='tickets')
+
+
+def downgrade():
+    op.create_index('ix_tickets_event_status', 'tickets', ['event_id', 'status'])
+    op.drop_index('ix_tickets_event_status_resale_price', table_name='tickets')
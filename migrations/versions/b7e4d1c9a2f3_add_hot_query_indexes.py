@@ -0,0 +1,45 @@
+"""Add indexes for hot query paths
+
+Revision ID: b7e4d1c9a2f3
+Revises: 3f9c2a7d5e41
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4d1c9a2f3'
+down_revision = '3f9c2a7d5e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Event listings (status/category filters, date ordering) and /events/my-events
+    op.create_index('ix_events_status_date', 'events', ['status', 'date', 'id'])
+    op.create_index('ix_events_status_category_date', 'events', ['status', 'category', 'date'])
+    op.create_index('ix_events_user_id', 'events', ['user_id'])
+
+    # Purchase path, availability counts and /tickets/my-tickets
+    op.create_index('ix_tickets_event_status', 'tickets', ['event_id', 'status'])
+    op.create_index(
+        'ix_tickets_event_available', 'tickets', ['event_id'],
+        postgresql_where=sa.text("status = 'available'"),
+        sqlite_where=sa.text("status = 'available'")
+    )
+    op.create_index('ix_tickets_user_id', 'tickets', ['user_id'])
+
+    # ticket.transactions
+    op.create_index('ix_transactions_ticket_id', 'transactions', ['ticket_id'])
+
+
+def downgrade():
+    op.drop_index('ix_transactions_ticket_id', table_name='transactions')
+    op.drop_index('ix_tickets_user_id', table_name='tickets')
+    op.drop_index('ix_tickets_event_available', table_name='tickets')
+    op.drop_index('ix_tickets_event_status', table_name='tickets')
+    op.drop_index('ix_events_user_id', table_name='events')
+    op.drop_index('ix_events_status_category_date', table_name='events')
+    op.drop_index('ix_events_status_date', table_name='events')
@@ -0,0 +1,61 @@
+"""Counter-based ticket inventory
+
+Tickets are no longer pre-created for every seat; events.tickets_sold is
+the inventory counter and a ticket row is minted per purchase.
+
+Revision ID: c41a8e2f6b90
+Revises: b7e4d1c9a2f3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a8e2f6b90'
+down_revision = 'b7e4d1c9a2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Unsold placeholder tickets carry no information once the counter is the inventory
+    op.execute("""
+        DELETE FROM tickets
+        WHERE status = 'available'
+          AND NOT EXISTS (SELECT 1 FROM transactions WHERE transactions.ticket_id = tickets.id)
+    """)
+    op.drop_index('ix_tickets_event_available', table_name='tickets')
+
+    op.execute('UPDATE events SET tickets_sold = 0 WHERE tickets_sold IS NULL')
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('tickets_sold', existing_type=sa.Integer(), nullable=False, server_default='0')
+
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seat_number', sa.Integer(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Number already-sold tickets in purchase order
+        op.execute("""
+            UPDATE tickets SET seat_number = numbered.seat
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY event_id ORDER BY purchase_date, id) AS seat
+                FROM tickets
+            ) AS numbered
+            WHERE tickets.id = numbered.id
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_column('seat_number')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('tickets_sold', existing_type=sa.Integer(), nullable=True, server_default=None)
+
+    op.create_index(
+        'ix_tickets_event_available', 'tickets', ['event_id'],
+        postgresql_where=sa.text("status = 'available'"),
+        sqlite_where=sa.text("status = 'available'")
+    )
@@ -0,0 +1,44 @@
+"""Add resale buy orders and listing time
+
+Revision ID: c8e2a5d7f1b4
+Revises: b3d7f1a9e5c2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e2a5d7f1b4'
+down_revision = 'b3d7f1a9e5c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('buy_orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('max_price', sa.Float(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('filled_quantity', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_buy_orders_event_status', 'buy_orders', ['event_id', 'status'])
+
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('listed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_column('listed_at')
+
+    op.drop_index('ix_buy_orders_event_status', table_name='buy_orders')
+    op.drop_table('buy_orders')
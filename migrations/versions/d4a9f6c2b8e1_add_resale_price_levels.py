@@ -0,0 +1,39 @@
+"""Add per-event resale price levels
+
+Revision ID: d4a9f6c2b8e1
+Revises: c8e2a5d7f1b4
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9f6c2b8e1'
+down_revision = 'c8e2a5d7f1b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resale_price_levels',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('listings', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+        sa.PrimaryKeyConstraint('event_id', 'price')
+    )
+
+    # Backfill from the tickets currently listed
+    op.execute("""
+        INSERT INTO resale_price_levels (event_id, price, listings)
+        SELECT event_id, resale_price, COUNT(*)
+        FROM tickets
+        WHERE status = 'resale' AND resale_price IS NOT NULL
+        GROUP BY event_id, resale_price
+    """)
+
+
+def downgrade():
+    op.drop_table('resale_price_levels')
@@ -0,0 +1,45 @@
+"""Add orders for multi-ticket purchases
+
+Revision ID: d8f3b6a1c2e7
+Revises: c41a8e2f6b90
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f3b6a1c2e7'
+down_revision = 'c41a8e2f6b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('total_price', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_tickets_order_id', 'orders', ['order_id'], ['id'])
+        batch_op.create_index('ix_tickets_order_id', ['order_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_index('ix_tickets_order_id')
+        batch_op.drop_constraint('fk_tickets_order_id', type_='foreignkey')
+        batch_op.drop_column('order_id')
+
+    op.drop_table('orders')
@@ -0,0 +1,47 @@
+"""Add timed reservation holds
+
+Revision ID: e2a9c7f4d1b3
+Revises: d8f3b6a1c2e7
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c7f4d1b3'
+down_revision = 'd8f3b6a1c2e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tickets_held', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table('reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hold_id', sa.String(length=32), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hold_id')
+    )
+    op.create_index('ix_reservations_status_expires_at', 'reservations', ['status', 'expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_reservations_status_expires_at', table_name='reservations')
+    op.drop_table('reservations')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('tickets_held')
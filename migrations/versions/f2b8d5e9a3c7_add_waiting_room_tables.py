@@ -0,0 +1,46 @@
+"""Add shared waiting room tables
+
+Revision ID: f2b8d5e9a3c7
+Revises: e7c4b9a2d6f1
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d5e9a3c7'
+down_revision = 'e7c4b9a2d6f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('waiting_room_queues',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('rate', sa.Float(), nullable=False),
+        sa.Column('admission_window', sa.Integer(), nullable=False),
+        sa.Column('next_seq', sa.Integer(), nullable=False),
+        sa.Column('admitted_upto', sa.Float(), nullable=False),
+        sa.Column('last_tick', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_table('waiting_room_entries',
+        sa.Column('token', sa.String(length=32), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('admitted_at', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['waiting_room_queues.event_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('token'),
+        sa.UniqueConstraint('event_id', 'seq', name='uq_waiting_room_entries_event_seq')
+    )
+    op.create_index('ix_waiting_room_entries_event_user', 'waiting_room_entries', ['event_id', 'user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_waiting_room_entries_event_user', table_name='waiting_room_entries')
+    op.drop_table('waiting_room_entries')
+    op.drop_table('waiting_room_queues')
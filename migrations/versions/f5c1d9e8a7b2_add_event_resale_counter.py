@@ -0,0 +1,33 @@
+"""Add resale listing counter to events
+
+Revision ID: f5c1d9e8a7b2
+Revises: e2a9c7f4d1b3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c1d9e8a7b2'
+down_revision = 'e2a9c7f4d1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tickets_resale', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute("""
+        UPDATE events SET tickets_resale = (
+            SELECT count(*) FROM tickets
+            WHERE tickets.event_id = events.id AND tickets.status = 'resale'
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('tickets_resale')
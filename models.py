@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import DDL, event
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
@@ -42,6 +43,12 @@ class User(db.Model):
 
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_status_date', 'status', 'date', 'id'),  # listing filter + (date, id) keyset order
+        db.Index('ix_events_status_category_date', 'status', 'category', 'date'),
+        db.Index('ix_events_user_id', 'user_id'),  # /events/my-events
+        db.Index('ix_events_updated_at', 'updated_at'),  # incremental counter reconciliation
+    )
 
     id = db.Column(db.Integer, primary_key = True)
     name = db.Column(db.String(100), nullable = False)
@@ -52,44 +59,142 @@ class Event(db.Model):
     date = db.Column(db.DateTime, nullable = False)  # Changed to DateTime
     price = db.Column(db.Float, nullable = False)
     image = db.Column(db.String)
-    capacity = db.Column(db.Integer, nullable = False)  # Total available tickets
-    tickets_sold = db.Column(db.Integer, default=0)  # Counter for sold tickets
+    capacity = db.Column(db.Integer, nullable = False)  # Total seats; Ticket rows are only minted when sold
+    tickets_sold = db.Column(db.Integer, default=0, server_default='0', nullable = False)  # Counter for sold tickets
+    tickets_held = db.Column(db.Integer, default=0, server_default='0', nullable = False)  # Seats in active reservations
+    tickets_resale = db.Column(db.Integer, default=0, server_default='0', nullable = False)  # Tickets currently listed for resale
     status = db.Column(db.String, default='upcoming')  # 'upcoming', 'ongoing', 'completed'
     category = db.Column(db.String)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Also bumped by counter UPDATEs
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
 
     # Relationships
     tickets = db.relationship('Ticket', backref='event', lazy=True)
 
-    def to_dict(self):
+    @property
+    def tickets_available(self):
+        """Seats that are neither sold nor held by a reservation."""
+        return max(self.capacity - (self.tickets_sold or 0) - (self.tickets_held or 0), 0)
+
+    # Keys of to_dict(), in order; each is a column of the same name
+    SERIALIZED_FIELDS = (
+        'id', 'name', 'location', 'location_lat', 'location_lng', 'description', 'date', 'price',
+        'image', 'capacity', 'tickets_sold', 'status', 'category', 'created_at', 'user_id'
+    )
+    # Named subsets clients can ask for instead of listing fields
+    FIELD_SETS = {
+        'card': ('id', 'name', 'date', 'image', 'price'),
+    }
+
+    # Fields whose column values need formatting; the rest serialize as-is
+    FIELD_FORMATTERS = {
+        'date': lambda value: value.isoformat(' ', 'seconds') if value else None,  # '%Y-%m-%d %H:%M:%S'
+        'created_at': lambda value: value.isoformat() if value else None,
+    }
+
+    @classmethod
+    def serialize_field(cls, field, value):
+        formatter = cls.FIELD_FORMATTERS.get(field)
+        return formatter(value) if formatter else value
+
+    def to_dict(self, fields=None):
+        """Serialize the event; `fields` restricts it to those keys and reads only their columns."""
         return {
-            'id': self.id,
-            'name': self.name,
-            'location': self.location,
-            'location_lat': self.location_lat,
-            'location_lng': self.location_lng,
-            'description': self.description,
-            'date': self.date.strftime('%Y-%m-%d %H:%M:%S') if self.date else None,
-            'price': self.price,
-            'image': self.image,
-            'capacity': self.capacity,
-            'tickets_sold': self.tickets_sold,
-            'status': self.status,
-            'category': self.category,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'user_id': self.user_id
+            field: self.serialize_field(field, getattr(self, field))
+            for field in fields or self.SERIALIZED_FIELDS
         }
 
+    @classmethod
+    def projection(cls, fields=None):
+        """Columns to select for serializing `fields` straight from rows (see row_serializer)."""
+        return [getattr(cls, field) for field in fields or cls.SERIALIZED_FIELDS]
+
+    @classmethod
+    def row_serializer(cls, fields=None):
+        """
+        Function turning a row selected with projection(fields) into the dict
+        to_dict(fields) would build, without loading an Event instance.
+        Columns selected after the projection are ignored.
+        """
+        fields = tuple(fields or cls.SERIALIZED_FIELDS)
+        formatters = [(field, cls.FIELD_FORMATTERS[field]) for field in fields if field in cls.FIELD_FORMATTERS]
+
+        def serialize(row):
+            data = dict(zip(fields, row))
+            for field, formatter in formatters:
+                data[field] = formatter(data[field])
+            return data
+
+        return serialize
+
+# Full-text search index for events (see services/search_service.py).
+# Postgres keeps a generated tsvector column with a GIN index; SQLite (tests)
+# keeps an FTS5 shadow table in sync through triggers. Neither is mapped on
+# the model, so ORM inserts and updates never have to know about them.
+EVENT_SEARCH_DDL = {
+    'postgresql': [
+        """
+        ALTER TABLE events ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+        """,
+        'CREATE INDEX ix_events_search_vector ON events USING GIN (search_vector)',
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE events_fts USING fts5(
+            name, description, location, content='events', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts(rowid, name, description, location)
+            VALUES (new.id, new.name, new.description, new.location);
+        END
+        """,
+        """
+        CREATE TRIGGER events_fts_ad AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, name, description, location)
+            VALUES ('delete', old.id, old.name, old.description, old.location);
+        END
+        """,
+        """
+        CREATE TRIGGER events_fts_au AFTER UPDATE OF name, description, location ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, name, description, location)
+            VALUES ('delete', old.id, old.name, old.description, old.location);
+            INSERT INTO events_fts(rowid, name, description, location)
+            VALUES (new.id, new.name, new.description, new.location);
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in EVENT_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Event.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Event.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS events_fts').execute_if(dialect='sqlite'))
+
 class Ticket(db.Model):
     __tablename__ = 'tickets'
+    __table_args__ = (
+        db.Index('ix_tickets_event_status_resale_price', 'event_id', 'status', 'resale_price'),  # resale order book
+        db.Index('ix_tickets_user_id', 'user_id'),  # /tickets/my-tickets
+        db.Index('ix_tickets_order_id', 'order_id'),
+    )
        
     id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'))
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)  # Primary purchase that minted it
     price = db.Column(db.Float)
-    status = db.Column(db.String)  # 'available', 'sold', 'resale'
+    status = db.Column(db.String)  # 'sold', 'resale'
+    seat_number = db.Column(db.Integer, nullable=True)  # Allocated in purchase order, 1..capacity
     resale_price = db.Column(db.Float, nullable=True)  # Price when put up for resale
+    listed_at = db.Column(db.DateTime, nullable=True)  # When put up for resale; time priority in the matching engine
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     purchase_date = db.Column(db.DateTime, nullable=True)  # When the ticket was bought
     #owner attribute 
@@ -99,8 +204,138 @@ class Ticket(db.Model):
     # Relationships
     transactions = db.relationship('Transaction', backref='ticket', lazy=True)#Links Ticket to all its Transactions (useful for tracking resales)
 
+class Order(db.Model):
+    __tablename__ = 'orders'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    total_price = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String, default='completed')  # 'completed', 'cancelled'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    tickets = db.relationship('Ticket', backref='order', lazy=True, order_by='Ticket.seat_number')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'user_id': self.user_id,
+            'quantity': self.quantity,
+            'total_price': self.total_price,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class Reservation(db.Model):
+    __tablename__ = 'reservations'
+    __table_args__ = (
+        db.Index('ix_reservations_status_expires_at', 'status', 'expires_at'),  # expiry reaper
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hold_id = db.Column(db.String(32), unique=True, nullable=False)  # Opaque id handed to clients
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String, default='active')  # 'active', 'converted', 'released', 'expired'
+    expires_at = db.Column(db.DateTime, nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)  # Set once converted
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'hold_id': self.hold_id,
+            'event_id': self.event_id,
+            'quantity': self.quantity,
+            'status': self.status,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'order_id': self.order_id
+        }
+
+class BuyOrder(db.Model):
+    __tablename__ = 'buy_orders'
+    __table_args__ = (
+        db.Index('ix_buy_orders_event_status', 'event_id', 'status'),  # loading an event's order book
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    max_price = db.Column(db.Float, nullable=False)  # Highest resale price the buyer will pay per ticket
+    quantity = db.Column(db.Integer, nullable=False)
+    filled_quantity = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    status = db.Column(db.String, default='open')  # 'open', 'filled', 'cancelled'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'max_price': self.max_price,
+            'quantity': self.quantity,
+            'filled_quantity': self.filled_quantity,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class ResalePriceLevel(db.Model):
+    __tablename__ = 'resale_price_levels'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True)
+    price = db.Column(db.Float, primary_key=True)
+    listings = db.Column(db.Integer, nullable=False, default=0)  # Resale tickets listed at this price
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),  # purge-idempotency-keys
+    )
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of caller, method, path and client key
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of the request body
+    status_code = db.Column(db.Integer, nullable=True)  # Null while the first request is in flight
+    content_type = db.Column(db.String, nullable=True)
+    body = db.Column(db.LargeBinary, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class WaitingRoomQueue(db.Model):
+    __tablename__ = 'waiting_room_queues'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    rate = db.Column(db.Float, nullable=False)  # buyers admitted per second
+    admission_window = db.Column(db.Integer, nullable=False)  # seconds to buy once admitted
+    tail = db.Column(db.Float, nullable=False, default=0.0)  # unix time of the last admission slot handed out
+
+class WaitingRoomEntry(db.Model):
+    __tablename__ = 'waiting_room_entries'
+    __table_args__ = (
+        db.Index('ix_waiting_room_entries_event_user', 'event_id', 'user_id'),
+    )
+
+    token = db.Column(db.String(32), primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('waiting_room_queues.event_id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    admitted_at = db.Column(db.Float, nullable=False)  # unix time; claimed slot, or backdated once spent
+
+class ReconciliationRun(db.Model):
+    __tablename__ = 'reconciliation_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    incremental = db.Column(db.Boolean, default=False)
+    repaired = db.Column(db.Boolean, default=False)
+    events_checked = db.Column(db.Integer, default=0)
+    events_drifted = db.Column(db.Integer, default=0)
+
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_ticket_id', 'ticket_id'),  # ticket.transactions
+    )
        
     id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id'))
@@ -0,0 +1,99 @@
+"""
+Sold-out cache for the purchase path.
+
+Once an event is seen with no seats left, purchase attempts and
+/tickets/available/<id> answer from this cache without a database round
+trip. Anything that can return seats to inventory (released or expired
+holds, capacity changes, deletion) or change the snapshot's resale count
+invalidates the event's entry, and entries also lapse after
+AVAILABILITY_CACHE_TTL_SECONDS so other workers' changes are picked up.
+"""
+
+import threading
+import time
+from flask import current_app
+from services.etag_service import event_version
+from services.metrics_service import metrics
+
+
+class SoldOutCache:
+    """Per-process map of sold-out event ids to an availability snapshot, with expiry."""
+
+    def __init__(self, ttl=5, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # event_id -> (expires_at, availability payload, event version)
+
+    def get(self, event_id):
+        entry = self._entry(event_id)
+        return entry[1] if entry is not None else None
+
+    def version(self, event_id):
+        """The event version the cached payload was built from, or None."""
+        entry = self._entry(event_id)
+        return entry[2] if entry is not None else None
+
+    def _entry(self, event_id):
+        entry = self._entries.get(event_id)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            with self._lock:
+                self._entries.pop(event_id, None)
+            return None
+        return entry
+
+    def set(self, event_id, event_dict, version=None):
+        with self._lock:
+            self._entries[event_id] = (self._clock() + self.ttl, event_dict, version)
+
+    def invalidate(self, event_id):
+        with self._lock:
+            self._entries.pop(event_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Availability:
+    """Flask extension holding the sold-out cache."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AVAILABILITY_CACHE_TTL_SECONDS', 5)
+        app.extensions['availability'] = SoldOutCache(app.config['AVAILABILITY_CACHE_TTL_SECONDS'])
+
+    @staticmethod
+    def cache():
+        return current_app.extensions['availability']
+
+    def sold_out_snapshot(self, event_id):
+        """The cached availability payload if the event is known to be sold out, else None."""
+        snapshot = self.cache().get(event_id)
+        metrics.cache_lookup('sold_out', snapshot is not None)
+        return snapshot
+
+    def is_sold_out(self, event_id):
+        return self.sold_out_snapshot(event_id) is not None
+
+    def sold_out_version(self, event_id):
+        """Event version of the cached payload, for ETags, without counting a cache lookup."""
+        return self.cache().version(event_id)
+
+    def mark_sold_out(self, event):
+        self.cache().set(event.id, {
+            'event': event.to_dict(),
+            'available_tickets': 0,
+            'resale_tickets': event.tickets_resale
+        }, event_version(event))
+
+    def invalidate(self, event_id):
+        self.cache().invalidate(event_id)
+
+
+availability = Availability()
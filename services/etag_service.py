@@ -0,0 +1,78 @@
+"""
+Conditional GET for event reads.
+
+Views decorated with `conditional(version)` get a strong ETag derived from a
+cheap version lookup instead of from the response body, so a request whose
+`If-None-Match` still matches is answered 304 before the view loads or
+serializes anything. An event's version is its `updated_at` plus the ticket
+counters (counter UPDATEs also bump `updated_at`; the counters guard against
+two writes landing in the same clock tick).
+
+Listings use `conditional_page` instead: their ETag is a hash of the page
+actually returned, so revalidating one costs the page query (keyset pages
+stay a single indexed range read) but saves the transfer, without an
+aggregate over every event the filters match.
+"""
+
+from functools import wraps
+from flask import current_app, request
+from werkzeug.http import generate_etag
+from models import db, Event
+
+
+def event_version(event):
+    """Version of an Event instance or row carrying the versioned columns."""
+    return (event.updated_at.isoformat() if event.updated_at else None,
+            event.tickets_sold, event.tickets_held, event.tickets_resale)
+
+
+def load_event_version(event_id):
+    """Version of one event from a single-row lookup, or None if it does not exist."""
+    row = db.session.query(
+        Event.updated_at, Event.tickets_sold, Event.tickets_held, Event.tickets_resale
+    ).filter(Event.id == event_id).first()
+    return event_version(row) if row is not None else None
+
+
+def conditional(version):
+    """
+    Answer matching `If-None-Match` requests with 304 and tag 200 responses.
+
+    Args:
+        version: Callable taking the view's URL arguments and returning a
+            hashable version of the resource, or None to skip validation
+            (e.g. so the view can 404)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            current = version(**kwargs)
+            if current is None:
+                return view(*args, **kwargs)
+
+            etag = generate_etag(repr((request.endpoint, current)).encode())
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def conditional_page(view):
+    """Tag 200 responses with an ETag of their body; answer a matching `If-None-Match` with 304."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+        response.add_etag()
+        return response.make_conditional(request)
+
+    return wrapper
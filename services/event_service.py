@@ -1,8 +1,10 @@
 from datetime import datetime
-from models import db, Event, Ticket
+from models import db, Event
+from services.availability_service import availability
+from services.response_cache_service import response_cache
 
 def create_event(data, user_id):
-    """Creates a new event and its associated tickets."""
+    """Creates a new event. Tickets are minted at purchase time, not here."""
     try:
         event_date = datetime.strptime(data['date'], '%Y-%m-%d %H:%M:%S')
         if event_date <= datetime.utcnow():
@@ -26,23 +28,13 @@ def create_event(data, user_id):
             capacity=capacity,
             image=data.get('image'),
             user_id=user_id,
-            status='upcoming'
+            status='upcoming',
+            tickets_sold=0
         )
         
         db.session.add(new_event)
         db.session.commit()
-
-        tickets = []
-        for _ in range(capacity):
-            ticket = Ticket(
-                event_id=new_event.id,
-                price=price,
-                status='available'
-            )
-            tickets.append(ticket)
-        
-        db.session.bulk_save_objects(tickets)
-        db.session.commit()
+        response_cache.invalidate_event_listings()
 
         return new_event, None
 
@@ -70,15 +62,29 @@ def update_event(event, data):
             event.date = datetime.strptime(data['date'], '%Y-%m-%d %H:%M:%S')
         if 'price' in data:
             event.price = float(data['price'])
+        if 'capacity' in data:
+            capacity = int(data['capacity'])
+            # Conditional UPDATE, so a purchase or hold landing meanwhile cannot end up over capacity
+            resized = Event.query.filter(
+                Event.id == event.id,
+                Event.tickets_sold + Event.tickets_held <= capacity
+            ).update({Event.capacity: capacity}, synchronize_session=False)
+            if not resized:
+                db.session.rollback()
+                return None, {'error': 'Capacity cannot be less than tickets already sold or held'}
         if 'image' in data:
             event.image = data['image']
         if 'status' in data:
             event.status = data['status']
 
         db.session.commit()
+        availability.invalidate(event.id)
+        response_cache.invalidate_event(event.id)
+        response_cache.invalidate_event_listings()
         return event, None
 
     except (ValueError, TypeError):
+        db.session.rollback()
         return None, {'error': 'Invalid data format'}
     except Exception as e:
         db.session.rollback()
@@ -88,8 +94,12 @@ def update_event(event, data):
 def delete_event(event):
     """Deletes an event."""
     try:
+        event_id = event.id
         db.session.delete(event)
         db.session.commit()
+        availability.invalidate(event_id)
+        response_cache.invalidate_event(event_id)
+        response_cache.invalidate_event_listings()
         return True, None
     except Exception as e:
         db.session.rollback()
@@ -7,6 +7,7 @@ import os
 import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from services.metrics_service import metrics
 
 class EventbriteService:
     """Service for fetching events from Eventbrite API"""
@@ -96,8 +97,9 @@ class EventbriteService:
                 params['categories'] = eventbrite_category
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
+            with metrics.upstream_timer('eventbrite', 'search_events'):
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                response.raise_for_status()
             
             data = response.json()
             
@@ -153,8 +155,9 @@ class EventbriteService:
                 params['categories'] = eventbrite_category
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
+            with metrics.upstream_timer('eventbrite', 'events_near_location'):
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                response.raise_for_status()
             
             data = response.json()
             events = [self._transform_event(event) for event in data.get('events', [])]
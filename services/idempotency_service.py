@@ -0,0 +1,262 @@
+"""
+Idempotency keys for mutating endpoints.
+
+A client that sends `Idempotency-Key: <uuid>` gets the first response for
+that key replayed on every retry, without the view running again. Keys are
+scoped to the caller and route and remembered for IDEMPOTENCY_TTL_SECONDS.
+While the first request runs, its claim is only a lease of
+IDEMPOTENCY_PENDING_LEASE_SECONDS: if the worker dies mid-request, a retry
+after the lease runs the request instead of getting 409 for the whole TTL.
+Server errors and responses that mean "try again" (409, 429) are not
+stored, so a retry after them re-executes.
+
+The default LocalIdempotencyStore lives in process memory (LRU-evicted
+beyond IDEMPOTENCY_MAX_KEYS), so it only protects single-process
+deployments: under gunicorn a retry that lands on another worker runs
+again. Multi-worker deployments must use a shared store such as
+DatabaseIdempotencyStore (ProductionConfig's default), whose expired keys
+are removed by `flask purge-idempotency-keys`.
+"""
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import import_string
+from models import db, IdempotencyKey
+from services.metrics_service import metrics
+
+KEY_HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+NEW, PENDING, REPLAY, MISMATCH = 'new', 'pending', 'replay', 'mismatch'
+
+# Answers a client should retry with the same key (in progress elsewhere, rate limited)
+RETRYABLE_STATUSES = frozenset({409, 429})
+
+
+class IdempotencyStore(ABC):
+    """Interface for idempotency key storage; all methods must be safe across threads."""
+
+    @abstractmethod
+    def begin(self, key, fingerprint):
+        """
+        Claim `key` for a request whose body hashes to `fingerprint`.
+
+        Returns:
+            (outcome, stored_response) where outcome is NEW (caller must run
+            the request and then complete() or abort()), PENDING, REPLAY or
+            MISMATCH; stored_response is set for REPLAY only
+        """
+
+    @abstractmethod
+    def complete(self, key, response):
+        """Store `response` as (status, headers, body) for `key`."""
+
+    @abstractmethod
+    def abort(self, key):
+        """Forget a claimed key so the request can be retried."""
+
+
+class LocalIdempotencyStore(IdempotencyStore):
+    """In-process LRU store with per-key expiry."""
+
+    def __init__(self, max_keys=10000, ttl=86400, lease=120, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.lease = lease
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> [expires_at, fingerprint, response or None]
+
+    def begin(self, key, fingerprint):
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self._entries[key] = [now + self.lease, fingerprint, None]
+                self._evict(now)
+                return NEW, None
+
+            self._entries.move_to_end(key)
+            if entry[1] != fingerprint:
+                return MISMATCH, None
+            if entry[2] is None:
+                return PENDING, None
+            return REPLAY, entry[2]
+
+    def complete(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry[0] = self._clock() + self.ttl
+                entry[2] = response
+
+    def abort(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        # Drop expired keys from the cold end, then the least recently used past capacity
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest[0] > now and len(self._entries) <= self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Store in the idempotency_keys table, shared by every worker.
+
+    Each call runs in its own short transaction on a separate connection, so
+    a claim is visible to other workers before the view runs and is not
+    rolled back with the view's own transaction.
+    """
+
+    table = IdempotencyKey.__table__
+
+    def begin(self, key, fingerprint):
+        key = _digest(key)
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.key == key, self.table.c.expires_at <= now))
+
+        try:
+            with db.engine.begin() as conn:
+                # A pending claim is a short lease, so a dead worker's key is taken over by a retry
+                conn.execute(self.table.insert().values(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=current_app.config['IDEMPOTENCY_PENDING_LEASE_SECONDS'])
+                ))
+            return NEW, None
+        except IntegrityError:
+            pass  # claimed before
+
+        with db.engine.connect() as conn:
+            row = conn.execute(self.table.select().where(self.table.c.key == key)).first()
+        if row is None:
+            return PENDING, None  # aborted or purged since our insert failed; the client retries
+        if row.fingerprint != fingerprint:
+            return MISMATCH, None
+        if row.status_code is None:
+            return PENDING, None
+        return REPLAY, (row.status_code, {'Content-Type': row.content_type}, row.body)
+
+    def complete(self, key, response):
+        status, headers, body = response
+        with db.engine.begin() as conn:
+            conn.execute(self.table.update().where(self.table.c.key == _digest(key)).values(
+                status_code=status, content_type=headers.get('Content-Type'), body=body,
+                expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['IDEMPOTENCY_TTL_SECONDS'])
+            ))
+
+    def abort(self, key):
+        with db.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.key == _digest(key)))
+
+
+def purge_expired_keys():
+    """Delete expired rows from the idempotency_keys table; returns how many."""
+    table = IdempotencyKey.__table__
+    with db.engine.begin() as conn:
+        return conn.execute(table.delete().where(table.c.expires_at <= datetime.utcnow())).rowcount
+
+
+def _digest(key):
+    # Client keys are arbitrary strings; store a fixed-length digest
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class Idempotency:
+    """Flask extension holding the configured idempotency store."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IDEMPOTENCY_BACKEND', None)
+        app.config.setdefault('IDEMPOTENCY_TTL_SECONDS', 86400)
+        app.config.setdefault('IDEMPOTENCY_MAX_KEYS', 10000)
+        app.config.setdefault('IDEMPOTENCY_PENDING_LEASE_SECONDS', 120)
+
+        store = app.config['IDEMPOTENCY_BACKEND']
+        if store is None:
+            store = LocalIdempotencyStore(
+                app.config['IDEMPOTENCY_MAX_KEYS'],
+                app.config['IDEMPOTENCY_TTL_SECONDS'],
+                app.config['IDEMPOTENCY_PENDING_LEASE_SECONDS']
+            )
+        elif isinstance(store, str):
+            store = import_string(store)()
+        app.extensions['idempotency'] = store
+
+    @staticmethod
+    def store():
+        return current_app.extensions['idempotency']
+
+
+idempotency = Idempotency()
+
+
+def idempotent(view):
+    """
+    Replay the stored response for a repeated Idempotency-Key.
+
+    Requests without the header run normally. Must be applied under
+    @jwt_required() so keys are scoped to the caller.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        client_key = request.headers.get(KEY_HEADER)
+        if not client_key:
+            return view(*args, **kwargs)
+
+        store = idempotency.store()
+        key = f'{get_jwt_identity()}:{request.method}:{request.path}:{client_key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+        outcome, stored = store.begin(key, fingerprint)
+        metrics.cache_lookup('idempotency', outcome == REPLAY)
+        if outcome == REPLAY:
+            status, headers, body = stored
+            response = current_app.response_class(body, status=status, headers=headers)
+            response.headers[REPLAY_HEADER] = 'true'
+            return response
+        if outcome == PENDING:
+            return jsonify({'error': f'A request with this {KEY_HEADER} is already in progress'}), 409
+        if outcome == MISMATCH:
+            return jsonify({'error': f'{KEY_HEADER} was already used with a different request body'}), 422
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            store.abort(key)
+            raise
+
+        if response.status_code >= 500 or response.status_code in RETRYABLE_STATUSES:
+            store.abort(key)
+        else:
+            store.complete(key, (
+                response.status_code,
+                {'Content-Type': response.headers.get('Content-Type')},
+                response.get_data()
+            ))
+        return response
+
+    return wrapper
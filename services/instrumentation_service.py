@@ -0,0 +1,124 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events count the statements each request sends and time
+them. With SERVER_TIMING_ENABLED (DevelopmentConfig only, since any client
+can read it) responses get a `Server-Timing` header (database time and
+statement count, plus total handler time) that browser dev tools display
+directly. Requests over REQUEST_QUERY_BUDGET statements or
+REQUEST_LATENCY_BUDGET_MS milliseconds are logged as warnings. The stats for
+the request in flight are on `flask.g.request_stats`, and tests can read the
+last finished request's through `instrumentation.last_stats()`.
+"""
+
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+
+class RequestStats:
+    """Statement count and timings for one request."""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.queries = 0
+        self.db_time = 0.0  # seconds
+        self.duration = None  # seconds, set when the response is ready
+
+    def record(self, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+
+    def finish(self):
+        self.duration = self._clock() - self.started
+        return self
+
+    def server_timing(self):
+        noun = 'query' if self.queries == 1 else 'queries'
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} {noun}", app;dur={self.duration * 1000:.2f}'
+
+
+class SQLInstrumentation:
+    """Flask extension wiring request hooks to SQLAlchemy cursor events."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVER_TIMING_ENABLED', False)
+        app.config.setdefault('REQUEST_QUERY_BUDGET', 0)
+        app.config.setdefault('REQUEST_LATENCY_BUDGET_MS', 0)
+        app.extensions['sql_instrumentation'] = {'last': None, 'listeners': []}
+
+        # Class-level so every engine is covered without needing one at startup
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+
+    @staticmethod
+    def state():
+        return current_app.extensions['sql_instrumentation']
+
+    def current(self):
+        """Stats for the request in flight, or None outside a request."""
+        return g.get('request_stats') if has_request_context() else None
+
+    def last_stats(self):
+        """Stats for the most recently finished request in this process."""
+        return self.state()['last']
+
+    def add_listener(self, listener):
+        """Call `listener(request, response, stats)` after every instrumented request."""
+        self.state()['listeners'].append(listener)
+
+
+instrumentation = SQLInstrumentation()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    stats = instrumentation.current()
+    if stats is not None:
+        stats.record(time.perf_counter() - started)
+
+
+def _start_request():
+    g.request_stats = RequestStats()
+
+
+def _finish_request(response):
+    stats = g.pop('request_stats', None)
+    if stats is None:
+        return response
+    stats.finish()
+
+    config = current_app.config
+    if config['SERVER_TIMING_ENABLED']:
+        response.headers.add(SERVER_TIMING_HEADER, stats.server_timing())
+
+    query_budget = config['REQUEST_QUERY_BUDGET']
+    latency_budget = config['REQUEST_LATENCY_BUDGET_MS']
+    if (query_budget and stats.queries > query_budget) or (latency_budget and stats.duration * 1000 > latency_budget):
+        current_app.logger.warning(
+            f'Request over budget: {request.method} {request.path} ({request.endpoint}) ran '
+            f'{stats.queries} queries, {stats.db_time * 1000:.1f}ms in the database, '
+            f'{stats.duration * 1000:.1f}ms total'
+        )
+
+    state = instrumentation.state()
+    state['last'] = stats
+    for listener in state['listeners']:
+        listener(request, response, stats)
+    return response
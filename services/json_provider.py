@@ -0,0 +1,51 @@
+"""
+JSON provider for the app.
+
+OrjsonProvider serializes jsonify() responses with orjson when it is
+installed, writing bytes straight into the response, and falls back to
+Flask's stdlib provider otherwise. Output matches the stdlib provider
+(sorted keys, compact outside debug, indented in debug, datetimes as HTTP
+dates), except that non-ASCII text is sent as UTF-8 rather than \\u escapes.
+Calls to dumps() that pass any json.dumps arguments (an explicit indent or
+separators, say) go to the stdlib so those arguments are honoured exactly.
+Set JSON_PROVIDER to a dotted path to use a different provider class.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson when available, stdlib json otherwise."""
+
+    def _options(self, indent=False):
+        # Datetimes go through Flask's `default` so they keep the stdlib format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,334 @@
+"""
+Resale matching engine.
+
+Instead of racing for one listing, buyers post buy orders (bids: a max price
+and a quantity) and resale tickets are the asks. Matching an event builds an
+order book from the database (only the price range where bids and asks
+cross) with price-time priority (highest bid, then oldest; cheapest ask,
+then longest listed) and pairs crossing orders, which trade at the ask
+price.
+
+The database is the only book, so any worker can match any event. Within a
+process, matching is serialized per event. Across processes, trades are
+written many per transaction, each one a compare-and-set on both the buy
+order and the ticket, so two workers matching the same event can only
+lose races, never double-fill an order or sell a ticket twice. `flask
+match-resale` matches every upcoming event with open bids.
+"""
+
+import heapq
+import threading
+from collections import Counter, namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import case, func
+from models import db, BuyOrder, Event, Ticket, Transaction
+from services.availability_service import availability
+from services.resale_stats_service import adjust_price_level
+from services.response_cache_service import response_cache
+from services.ticket_service import validate_quantity
+
+DEFAULT_BATCH_SIZE = 100
+
+Trade = namedtuple('Trade', 'order_id buyer_id bid_key ticket_id seller_id price ask_key')
+
+
+class OrderBook:
+    """Bids and asks for one event. Not thread-safe; each match builds its own."""
+
+    def __init__(self):
+        self._bid_heap = []  # (-max_price, created_at, order_id)
+        self._ask_heap = []  # (resale_price, listed_at, ticket_id)
+        self.bids = {}  # order_id -> [user_id, max_price, remaining, heap key]
+        self.asks = {}  # ticket_id -> (seller_id, resale_price, heap key)
+
+    def add_bid(self, order_id, user_id, max_price, remaining, created_at=None):
+        if remaining <= 0:
+            return
+        key = (-max_price, created_at or datetime.min, order_id)
+        self.bids[order_id] = [user_id, max_price, remaining, key]
+        heapq.heappush(self._bid_heap, key)
+
+    def add_ask(self, ticket_id, seller_id, price, listed_at=None):
+        key = (price, listed_at or datetime.min, ticket_id)
+        self.asks[ticket_id] = (seller_id, price, key)
+        heapq.heappush(self._ask_heap, key)
+
+    def cross(self, limit):
+        """
+        Pop up to `limit` crossing (bid, ask) pairs in priority order.
+
+        A bid never trades with its owner's own listings; those are skipped
+        for that bid and stay available to the bids behind it.
+        """
+        trades = []
+        passed_bids = []
+
+        while len(trades) < limit:
+            order_id = self._top(self._bid_heap, self.bids)
+            if order_id is None:
+                break
+            buyer_id, max_price, remaining, bid_key = self.bids[order_id]
+
+            ticket_id = None
+            own_asks = []
+            while True:
+                candidate = self._top(self._ask_heap, self.asks)
+                if candidate is None or self.asks[candidate][1] > max_price:
+                    break
+                entry = heapq.heappop(self._ask_heap)
+                if self.asks[candidate][0] != buyer_id:
+                    ticket_id = candidate
+                    break
+                own_asks.append(entry)
+            for entry in own_asks:
+                heapq.heappush(self._ask_heap, entry)
+
+            if ticket_id is None:
+                if not own_asks:
+                    break  # the best bid does not cross, so nothing behind it does
+                passed_bids.append(heapq.heappop(self._bid_heap))
+                continue
+
+            seller_id, price, ask_key = self.asks.pop(ticket_id)
+            trades.append(Trade(order_id, buyer_id, bid_key, ticket_id, seller_id, price, ask_key))
+            if remaining == 1:
+                del self.bids[order_id]
+            else:
+                self.bids[order_id][2] = remaining - 1
+
+        for entry in passed_bids:
+            heapq.heappush(self._bid_heap, entry)
+        return trades
+
+    @staticmethod
+    def _top(heap, live):
+        # Entries are removed lazily: skip heap keys whose order left the book or was re-added
+        while heap:
+            key = heap[0]
+            entry = live.get(key[-1])
+            if entry is not None and entry[-1] == key:
+                return key[-1]
+            heapq.heappop(heap)
+        return None
+
+
+class MatchingEngine:
+    """Flask extension serializing matching per event within this process."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['matching'] = {'locks': {}, 'lock': threading.Lock()}
+
+    @staticmethod
+    def state():
+        return current_app.extensions['matching']
+
+    def match(self, event_id, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Match an event's bids and asks until none cross.
+
+        Returns:
+            Number of trades executed
+        """
+        with self._event_lock(event_id):
+            executed = 0
+            while True:
+                # Rebuilt every round, so orders changed by other workers are never acted on stale
+                trades = load_book(event_id).cross(batch_size)
+                if not trades:
+                    return executed
+                try:
+                    done = _execute_trades(event_id, trades)
+                except Exception:
+                    db.session.rollback()
+                    # In a real app, you'd want to log this error
+                    return executed
+                executed += done
+                if not done:
+                    return executed  # every trade lost its race; whoever won is matching this event
+
+    def _event_lock(self, event_id):
+        state = self.state()
+        with state['lock']:
+            return state['locks'].setdefault(event_id, threading.Lock())
+
+
+matching = MatchingEngine()
+
+
+def load_book(event_id):
+    """
+    Build the crossing part of an event's book from the database: open bids
+    at or above the cheapest listing and listings at or below the best bid.
+    Orders outside that range cannot trade, so they are not loaded, and
+    neither is anything for an event that has already taken place.
+    """
+    book = OrderBook()
+    best_bid = db.session.query(func.max(BuyOrder.max_price)).join(Event, Event.id == BuyOrder.event_id).filter(
+        BuyOrder.event_id == event_id, BuyOrder.status == 'open', Event.date > datetime.utcnow()
+    ).scalar()
+    best_ask = db.session.query(func.min(Ticket.resale_price)).filter(
+        Ticket.event_id == event_id, Ticket.status == 'resale'
+    ).scalar()
+    if best_bid is None or best_ask is None or best_bid < best_ask:
+        return book
+
+    bids = db.session.query(
+        BuyOrder.id, BuyOrder.user_id, BuyOrder.max_price, BuyOrder.quantity - BuyOrder.filled_quantity, BuyOrder.created_at
+    ).filter(BuyOrder.event_id == event_id, BuyOrder.status == 'open', BuyOrder.max_price >= best_ask)
+    for order_id, user_id, max_price, remaining, created_at in bids:
+        book.add_bid(order_id, user_id, max_price, remaining, created_at)
+
+    asks = db.session.query(Ticket.id, Ticket.user_id, Ticket.resale_price, Ticket.listed_at).filter(
+        Ticket.event_id == event_id, Ticket.status == 'resale', Ticket.resale_price <= best_bid
+    )
+    for ticket_id, seller_id, price, listed_at in asks:
+        book.add_ask(ticket_id, seller_id, price, listed_at)
+    return book
+
+
+def _execute_trades(event_id, trades):
+    """
+    Write a batch of trades in one transaction.
+
+    Each trade first takes a unit of its buy order (only while the order is
+    open and unfilled), then moves the ticket (only while it is still listed
+    by the same seller at the same price). A trade whose order or listing is
+    gone is skipped, handing back the order's unit in the latter case; the
+    next round's book no longer contains it.
+    """
+    now = datetime.utcnow()
+    done = []
+    dead_orders = set()
+
+    for trade in trades:
+        if trade.order_id in dead_orders:
+            continue
+
+        taken = BuyOrder.query.filter(
+            BuyOrder.id == trade.order_id,
+            BuyOrder.status == 'open',
+            BuyOrder.filled_quantity < BuyOrder.quantity
+        ).update({
+            BuyOrder.filled_quantity: BuyOrder.filled_quantity + 1,
+            BuyOrder.status: case((BuyOrder.filled_quantity + 1 >= BuyOrder.quantity, 'filled'), else_=BuyOrder.status)
+        }, synchronize_session=False)
+        if not taken:
+            dead_orders.add(trade.order_id)
+            continue
+
+        moved = Ticket.query.filter(
+            Ticket.id == trade.ticket_id,
+            Ticket.status == 'resale',
+            Ticket.user_id == trade.seller_id,
+            Ticket.resale_price == trade.price
+        ).update({
+            Ticket.status: 'sold',
+            Ticket.user_id: trade.buyer_id,
+            Ticket.purchase_date: now,
+            Ticket.resale_price: None,
+            Ticket.listed_at: None
+        }, synchronize_session=False)
+        if not moved:
+            # Hand the unit back; the order row is still locked by the update above
+            BuyOrder.query.filter(BuyOrder.id == trade.order_id).update({
+                BuyOrder.filled_quantity: BuyOrder.filled_quantity - 1,
+                BuyOrder.status: 'open'
+            }, synchronize_session=False)
+            continue
+
+        done.append(trade)
+
+    if done:
+        db.session.bulk_insert_mappings(Transaction, [
+            {
+                'ticket_id': trade.ticket_id,
+                'seller_id': trade.seller_id,
+                'buyer_id': trade.buyer_id,
+                'price': trade.price,
+                'timestamp': now,
+                'transaction_type': 'resale',
+                'status': 'completed'
+            }
+            for trade in done
+        ])
+        Event.query.filter(Event.id == event_id).update(
+            {Event.tickets_resale: Event.tickets_resale - len(done)},
+            synchronize_session=False
+        )
+        for price, count in Counter(trade.price for trade in done).items():
+            adjust_price_level(event_id, price, -count)
+
+    db.session.commit()
+    if done:
+        availability.invalidate(event_id)
+        response_cache.invalidate_event(event_id)
+    return len(done)
+
+
+def place_buy_order(event_id, user_id, max_price, quantity):
+    """Posts a buy order for resale tickets and matches it against current listings."""
+    error = validate_quantity(quantity)
+    if error:
+        return None, error
+
+    event = Event.query.get(event_id)
+    if not event:
+        return None, {'error': 'Event not found'}
+
+    if event.date < datetime.utcnow():
+        return None, {'error': 'Event has already taken place'}
+
+    try:
+        order = BuyOrder(
+            event_id=event_id,
+            user_id=user_id,
+            max_price=max_price,
+            quantity=quantity,
+            filled_quantity=0,
+            status='open'
+        )
+        db.session.add(order)
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to place buy order: {str(e)}'}
+
+    matching.match(event_id)
+    return order, None
+
+
+def cancel_buy_order(order_id, user_id):
+    """Cancels the unfilled remainder of a buy order."""
+    order = BuyOrder.query.get(order_id)
+    if not order:
+        return None, {'error': 'Buy order not found'}
+
+    if order.user_id != user_id:
+        return None, {'error': 'Unauthorized'}
+
+    try:
+        # Compare-and-set so a concurrent fill wins over the cancel
+        cancelled = BuyOrder.query.filter(
+            BuyOrder.id == order_id,
+            BuyOrder.status == 'open'
+        ).update({BuyOrder.status: 'cancelled'}, synchronize_session=False)
+
+        if not cancelled:
+            db.session.rollback()
+            return None, {'error': 'Buy order is not open'}
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to cancel buy order: {str(e)}'}
+
+    return order, None
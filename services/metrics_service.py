@@ -0,0 +1,183 @@
+"""
+Prometheus metrics, recorded with prometheus_client.
+
+Each app records request counts, latency histograms, in-flight requests,
+database pool activity, upstream (Eventbrite) latency and cache lookups,
+and GET /metrics renders them in the Prometheus text format.
+
+Under gunicorn every worker records into its own process, so set
+PROMETHEUS_MULTIPROC_DIR in the environment before the app is imported:
+prometheus_client then writes each worker's samples to memory-mapped files
+in that directory as they are recorded, and /metrics aggregates every
+worker's files at scrape time (counters and histograms summed, gauges
+summed over live workers). gunicorn.conf.py clears the directory at startup
+and marks exited workers dead.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+ROUTE_LABELS = ('blueprint', 'endpoint', 'method')
+
+# name -> (type, help, label names, histogram buckets)
+METRICS = {
+    'ticketi_http_requests_total': (Counter, 'HTTP requests by route and status.', ROUTE_LABELS + ('status',), None),
+    'ticketi_http_request_duration_seconds': (Histogram, 'HTTP request latency by route.', ROUTE_LABELS, LATENCY_BUCKETS),
+    'ticketi_http_requests_in_flight': (Gauge, 'HTTP requests being handled, by blueprint.', ('blueprint',), None),
+    'ticketi_db_statements_per_request': (Histogram, 'SQL statements per HTTP request by route.', ROUTE_LABELS, QUERY_COUNT_BUCKETS),
+    'ticketi_db_duration_seconds': (Histogram, 'Time spent in SQL per HTTP request by route.', ROUTE_LABELS, LATENCY_BUCKETS),
+    'ticketi_db_pool_checkouts_total': (Counter, 'Connections checked out of the pool.', (), None),
+    'ticketi_db_pool_connections_created_total': (Counter, 'New database connections opened by the pool.', (), None),
+    'ticketi_db_pool_checked_out': (Gauge, 'Pool connections currently checked out.', (), None),
+    'ticketi_upstream_request_duration_seconds': (
+        Histogram, 'Latency of calls to upstream APIs.', ('service', 'operation', 'outcome'), LATENCY_BUCKETS
+    ),
+    'ticketi_cache_lookups_total': (Counter, 'Cache lookups by cache and result (hit or miss).', ('cache', 'result'), None),
+}
+
+
+def create_collectors(registry):
+    """Build every metric in METRICS, registered with `registry`; returns name -> collector."""
+    collectors = {}
+    for name, (kind, help_text, labelnames, buckets) in METRICS.items():
+        kwargs = {'registry': registry}
+        if kind is Histogram:
+            kwargs['buckets'] = buckets
+        elif kind is Gauge:
+            kwargs['multiprocess_mode'] = 'livesum'  # dead workers drop out of in-flight totals
+        collectors[name] = kind(name, help_text, labelnames, **kwargs)
+    return collectors
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+class Metrics:
+    """Flask extension holding this app's metric collectors."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        registry = CollectorRegistry()
+        app.extensions['metrics'] = {
+            'registry': registry,
+            'collectors': create_collectors(registry)
+        }
+
+        if not event.contains(Pool, 'checkout', _on_checkout):
+            event.listen(Pool, 'checkout', _on_checkout)
+            event.listen(Pool, 'checkin', _on_checkin)
+            event.listen(Pool, 'connect', _on_connect)
+
+        app.before_request(_start_request)
+        app.teardown_request(_end_request)
+
+        from services.instrumentation_service import instrumentation
+        with app.app_context():
+            instrumentation.add_listener(_record_request)
+
+    @staticmethod
+    def collector(name, labels=()):
+        """The child of metric `name` for `labels`, or None outside an app with metrics."""
+        if not has_app_context() or 'metrics' not in current_app.extensions:
+            return None
+        collector = current_app.extensions['metrics']['collectors'][name]
+        return collector.labels(**labels) if labels else collector
+
+    def inc(self, name, labels=(), amount=1):
+        collector = self.collector(name, labels)
+        if collector is None:
+            return
+        if amount < 0:
+            collector.dec(-amount)  # gauges only
+        else:
+            collector.inc(amount)
+
+    def observe(self, name, labels, value):
+        collector = self.collector(name, labels)
+        if collector is not None:
+            collector.observe(value)
+
+    def cache_lookup(self, cache, hit):
+        self.inc('ticketi_cache_lookups_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+    @contextmanager
+    def upstream_timer(self, service, operation):
+        """Time a call to an upstream API; the outcome label is 'error' if the block raises."""
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            self.observe(
+                'ticketi_upstream_request_duration_seconds',
+                {'service': service, 'operation': operation, 'outcome': outcome},
+                time.perf_counter() - started
+            )
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format, aggregated across workers if configured."""
+        if not multiprocess_dir():
+            return generate_latest(current_app.extensions['metrics']['registry'])
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+
+metrics = Metrics()
+
+
+def _route_labels():
+    return {
+        'blueprint': request.blueprint or 'app',
+        # The endpoint, not the path, so ids in URLs do not explode label cardinality
+        'endpoint': request.endpoint or 'unmatched',
+        'method': request.method
+    }
+
+
+def _start_request():
+    g.metrics_blueprint = request.blueprint or 'app'
+    metrics.inc('ticketi_http_requests_in_flight', {'blueprint': g.metrics_blueprint})
+
+
+def _end_request(exc):
+    blueprint = g.pop('metrics_blueprint', None)
+    if blueprint is not None:
+        metrics.inc('ticketi_http_requests_in_flight', {'blueprint': blueprint}, -1)
+
+
+def _record_request(req, response, stats):
+    labels = _route_labels()
+    metrics.inc('ticketi_http_requests_total', {**labels, 'status': str(response.status_code)})
+    metrics.observe('ticketi_http_request_duration_seconds', labels, stats.duration)
+    metrics.observe('ticketi_db_statements_per_request', labels, stats.queries)
+    metrics.observe('ticketi_db_duration_seconds', labels, stats.db_time)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    metrics.inc('ticketi_db_pool_checkouts_total')
+    metrics.inc('ticketi_db_pool_checked_out')
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    metrics.inc('ticketi_db_pool_checked_out', (), -1)
+
+
+def _on_connect(dbapi_connection, connection_record):
+    metrics.inc('ticketi_db_pool_connections_created_total')
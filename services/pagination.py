@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort key of the last row
+a client has seen. Fetching the next page is then a `WHERE (key) > (cursor)`
+range scan on an index instead of an OFFSET, so page N costs the same as
+page 1 and no COUNT(*) is needed.
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import DateTime, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(values):
+    """Encode a tuple of sort key values into an opaque cursor string."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor back into sort key values for `columns`.
+
+    Raises:
+        InvalidCursor: if the cursor is malformed or does not match the columns
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor(cursor)
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def keyset_paginate(query, columns, cursor=None, limit=10):
+    """
+    Fetch one page of `query` ordered by `columns` (ascending).
+
+    Args:
+        query: Query to paginate; must not already be ordered
+        columns: Sort key columns, the last of which must be unique (e.g. the id)
+        cursor: Cursor returned with the previous page, or None for the first page
+        limit: Page size
+
+    Returns:
+        (items, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: if `cursor` cannot be decoded
+        ValueError: if `limit` is not positive
+    """
+    if limit < 1:
+        raise ValueError(f'limit must be positive, got {limit}')
+    if cursor:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    items = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return items, next_cursor
@@ -0,0 +1,214 @@
+"""
+Opt-in per-request profiling.
+
+With PROFILER_DIR set, a request is profiled when it carries a valid signed
+`X-Profile` header (mint one with `flask profile-token`) or its endpoint is
+listed in PROFILER_ENDPOINTS. PROFILER_MODE picks the output:
+
+- 'cprofile': deterministic profile saved as a pstats `.prof` file
+  (snakeviz, flameprof, or `flask profile-summary`)
+- 'sample': the request thread's stack sampled every PROFILER_SAMPLE_INTERVAL
+  seconds and saved in collapsed-stack format (`.collapsed`, one
+  `frame;frame;frame count` line per stack), ready for flamegraph.pl or
+  speedscope
+
+Only the newest PROFILER_MAX_FILES profiles are kept. Without PROFILER_DIR
+no hooks are registered at all, so there is no per-request cost.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+# cProfile hooks are process-wide on newer Pythons, so profile one request at a time
+_cprofile_lock = threading.Lock()
+
+
+class Profiler:
+    """Flask extension registering the profiling hooks when PROFILER_DIR is configured."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILER_DIR', None)
+        app.config.setdefault('PROFILER_SECRET', None)
+        app.config.setdefault('PROFILER_ENDPOINTS', ())
+        app.config.setdefault('PROFILER_MODE', 'cprofile')
+        app.config.setdefault('PROFILER_MAX_FILES', 200)
+        app.config.setdefault('PROFILER_SAMPLE_INTERVAL', 0.001)
+
+        if not app.config['PROFILER_DIR']:
+            return
+        os.makedirs(app.config['PROFILER_DIR'], exist_ok=True)
+        app.before_request(_start_profile)
+        app.after_request(_finish_profile)
+        app.teardown_request(_abandon_profile)
+
+
+profiler = Profiler()
+
+
+def sign_token(secret, expires_at):
+    """An `X-Profile` header value valid until `expires_at` (unix time)."""
+    signature = hmac.new(secret.encode(), str(int(expires_at)).encode(), hashlib.sha256).hexdigest()
+    return f'{int(expires_at)}.{signature}'
+
+
+def verify_token(secret, token, now=None):
+    if not secret or not token or '.' not in token:
+        return False
+    expires_at, signature = token.split('.', 1)
+    if not re.fullmatch(r'[0-9]+', expires_at) or int(expires_at) < (now or time.time()):
+        return False
+    return hmac.compare_digest(sign_token(secret, int(expires_at)), token)
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _wants_profile():
+    config = current_app.config
+    if request.endpoint in config['PROFILER_ENDPOINTS']:
+        return True
+    token = request.headers.get(PROFILE_HEADER)
+    return token is not None and verify_token(config['PROFILER_SECRET'], token)
+
+
+def _start_profile():
+    if not _wants_profile():
+        return
+
+    if current_app.config['PROFILER_MODE'] == 'sample':
+        g.profile = StackSampler(threading.get_ident(), current_app.config['PROFILER_SAMPLE_INTERVAL']).start()
+        return
+
+    if not _cprofile_lock.acquire(blocking=False):
+        return  # another request is being profiled
+    g.profile = cProfile.Profile()
+    g.profile.enable()
+
+
+def _finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+
+    config = current_app.config
+    name = f'{time.time():.6f}-{os.getpid()}-{request.endpoint or "unmatched"}'
+    if isinstance(profile, StackSampler):
+        name += '.collapsed'
+        with open(os.path.join(config['PROFILER_DIR'], name), 'w') as f:
+            f.write(profile.stop().collapsed())
+    else:
+        profile.disable()
+        _cprofile_lock.release()
+        name += '.prof'
+        profile.dump_stats(os.path.join(config['PROFILER_DIR'], name))
+
+    _rotate(config['PROFILER_DIR'], config['PROFILER_MAX_FILES'])
+    response.headers[PROFILE_ID_HEADER] = name
+    return response
+
+
+def _abandon_profile(exc):
+    # after_request is skipped when a request fails outright; still stop profiling
+    profile = g.pop('profile', None)
+    if isinstance(profile, StackSampler):
+        profile.stop()
+    elif profile is not None:
+        profile.disable()
+        _cprofile_lock.release()
+
+
+def _rotate(directory, max_files):
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(('.prof', '.collapsed'))),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in profiles[:-max_files] if max_files else []:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass  # rotated by another worker
+
+
+def summarize(directory, limit=20):
+    """
+    Top frames across every captured profile.
+
+    Returns:
+        (cprofile_rows, sampled_rows): pstats rows as (function, calls,
+        total seconds, cumulative seconds) ordered by cumulative time, and
+        sampled frames as (frame, samples as leaf, samples on stack) ordered
+        by on-stack samples
+    """
+    prof_files = [entry.path for entry in os.scandir(directory) if entry.name.endswith('.prof')]
+    cprofile_rows = []
+    if prof_files:
+        stats = pstats.Stats(*prof_files)
+        rows = [
+            (f'{os.path.basename(filename)}:{line}({function})', calls, total, cumulative)
+            for (filename, line, function), (primitive, calls, total, cumulative, callers) in stats.stats.items()
+        ]
+        cprofile_rows = sorted(rows, key=lambda row: row[3], reverse=True)[:limit]
+
+    leaf = Counter()
+    on_stack = Counter()
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.collapsed'):
+            continue
+        with open(entry.path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                frames = stack.split(';')
+                leaf[frames[-1]] += int(count)
+                for frame in set(frames):
+                    on_stack[frame] += int(count)
+    sampled_rows = [(frame, leaf[frame], samples) for frame, samples in on_stack.most_common(limit)]
+
+    return cprofile_rows, sampled_rows
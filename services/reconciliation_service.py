@@ -0,0 +1,131 @@
+"""
+Reconciliation of the denormalized event counters.
+
+events.tickets_sold, tickets_held and tickets_resale let the hot paths
+avoid COUNT(*) over tickets, so they have to be right. This recomputes them
+from the source rows with one grouped aggregate statement per chunk of
+event ids, reports drift and optionally repairs it.
+"""
+
+from datetime import datetime
+from sqlalchemy import case, func
+from models import db, Event, Reservation, ReconciliationRun, Ticket
+from services.availability_service import availability
+from services.response_cache_service import response_cache
+
+COUNTERS = ('tickets_sold', 'tickets_held', 'tickets_resale')
+
+
+def reconcile_counters(chunk_size=1000, incremental=False, repair=True):
+    """
+    Recompute event counters and report (and optionally fix) drift.
+
+    Args:
+        chunk_size: Width of each event id range aggregated per statement
+        incremental: Only check events updated since the last finished
+            repairing run (dry runs leave drift in place, so they do not
+            move this watermark).
+            Every code path that touches tickets or holds also updates its
+            event row, so this catches drift from application writes; writes
+            made behind the application's back need a full run.
+        repair: Write corrections; otherwise only report
+
+    Returns:
+        Dict with events_checked, drifted (per-event stored/actual values)
+        and oversold (event ids selling more seats than capacity)
+    """
+    started_at = datetime.utcnow()
+    since = None
+    if incremental:
+        last_run = ReconciliationRun.query.filter(
+            ReconciliationRun.finished_at.isnot(None),
+            ReconciliationRun.repaired.is_(True)
+        ).order_by(ReconciliationRun.started_at.desc()).first()
+        since = last_run.started_at if last_run else None
+
+    scope = db.session.query(func.min(Event.id), func.max(Event.id))
+    if since:
+        scope = scope.filter(Event.updated_at >= since)
+    low, high = scope.one()
+
+    report = {'events_checked': 0, 'drifted': [], 'oversold': []}
+    if low is not None:
+        for chunk_start in range(low, high + 1, chunk_size):
+            _reconcile_chunk(chunk_start, chunk_start + chunk_size, since, repair, report)
+
+    db.session.add(ReconciliationRun(
+        started_at=started_at,
+        finished_at=datetime.utcnow(),
+        incremental=since is not None,
+        repaired=repair,
+        events_checked=report['events_checked'],
+        events_drifted=len(report['drifted'])
+    ))
+    db.session.commit()
+
+    return report
+
+
+def _reconcile_chunk(start, stop, since, repair, report):
+    tickets = db.session.query(
+        Ticket.event_id.label('event_id'),
+        func.count(Ticket.id).label('sold'),
+        func.sum(case((Ticket.status == 'resale', 1), else_=0)).label('resale')
+    ).filter(Ticket.event_id >= start, Ticket.event_id < stop).group_by(Ticket.event_id).subquery()
+
+    holds = db.session.query(
+        Reservation.event_id.label('event_id'),
+        func.sum(Reservation.quantity).label('held')
+    ).filter(
+        Reservation.event_id >= start,
+        Reservation.event_id < stop,
+        Reservation.status == 'active'
+    ).group_by(Reservation.event_id).subquery()
+
+    query = db.session.query(
+        Event.id,
+        Event.capacity,
+        Event.tickets_sold,
+        Event.tickets_held,
+        Event.tickets_resale,
+        func.coalesce(tickets.c.sold, 0).label('actual_sold'),
+        func.coalesce(holds.c.held, 0).label('actual_held'),
+        func.coalesce(tickets.c.resale, 0).label('actual_resale')
+    ).outerjoin(tickets, tickets.c.event_id == Event.id).outerjoin(
+        holds, holds.c.event_id == Event.id
+    ).filter(Event.id >= start, Event.id < stop)
+    if since:
+        query = query.filter(Event.updated_at >= since)
+
+    repaired = []
+    for row in query.all():
+        report['events_checked'] += 1
+        actual = dict(zip(COUNTERS, (row.actual_sold, row.actual_held, row.actual_resale)))
+        stored = dict(zip(COUNTERS, (row.tickets_sold, row.tickets_held, row.tickets_resale)))
+
+        if actual['tickets_sold'] + actual['tickets_held'] > row.capacity:
+            report['oversold'].append(row.id)
+
+        deltas = {name: actual[name] - stored[name] for name in COUNTERS if actual[name] != stored[name]}
+        if not deltas:
+            continue
+
+        report['drifted'].append({
+            'event_id': row.id,
+            **{name: {'stored': stored[name], 'actual': actual[name]} for name in deltas}
+        })
+
+        if repair:
+            # Apply deltas rather than absolute values so purchases that commit
+            # between the aggregate and this update are not overwritten
+            Event.query.filter(Event.id == row.id).update(
+                {getattr(Event, name): getattr(Event, name) + delta for name, delta in deltas.items()},
+                synchronize_session=False
+            )
+            repaired.append(row.id)
+
+    if repair:
+        db.session.commit()
+        for event_id in repaired:
+            availability.invalidate(event_id)
+            response_cache.invalidate_event(event_id)
@@ -0,0 +1,106 @@
+"""
+Resale price statistics per event.
+
+`resale_price_levels` holds one row per (event, listed price) with the number
+of tickets listed at that price. Every path that lists, sells or withdraws a
+resale ticket adjusts its level in the same transaction, so floor, median and
+listing count come from a handful of index rows instead of a scan of the
+tickets table. `flask rebuild-resale-stats` recomputes the levels from the
+tickets if they are ever in doubt.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, ResalePriceLevel, Ticket
+
+
+def adjust_price_level(event_id, price, delta):
+    """Add `delta` listings at `price` for an event, inside the current transaction."""
+    dialect = db.engine.dialect.name
+    if delta > 0 and dialect in ('postgresql', 'sqlite'):
+        insert = (postgresql if dialect == 'postgresql' else sqlite).insert(ResalePriceLevel)
+        db.session.execute(insert.values(event_id=event_id, price=price, listings=delta).on_conflict_do_update(
+            index_elements=[ResalePriceLevel.event_id, ResalePriceLevel.price],
+            set_={'listings': ResalePriceLevel.listings + insert.excluded.listings}
+        ))
+        return
+
+    level = ResalePriceLevel.query.filter_by(event_id=event_id, price=price)
+    updated = level.update(
+        {ResalePriceLevel.listings: ResalePriceLevel.listings + delta},
+        synchronize_session=False
+    )
+    if not updated and delta > 0:
+        db.session.add(ResalePriceLevel(event_id=event_id, price=price, listings=delta))
+    elif delta < 0:
+        level.filter(ResalePriceLevel.listings <= 0).delete(synchronize_session=False)
+
+
+def get_resale_stats(event_id):
+    """Floor, median, highest and average listed price, and the number of listings."""
+    levels = db.session.query(ResalePriceLevel.price, ResalePriceLevel.listings).filter(
+        ResalePriceLevel.event_id == event_id,
+        ResalePriceLevel.listings > 0
+    ).order_by(ResalePriceLevel.price).all()
+
+    listings = sum(count for price, count in levels)
+    if not listings:
+        return {
+            'event_id': event_id,
+            'listings': 0,
+            'floor_price': None,
+            'median_price': None,
+            'max_price': None,
+            'average_price': None
+        }
+
+    return {
+        'event_id': event_id,
+        'listings': listings,
+        'floor_price': levels[0][0],
+        'median_price': _median(levels, listings),
+        'max_price': levels[-1][0],
+        'average_price': round(sum(price * count for price, count in levels) / listings, 2)
+    }
+
+
+def rebuild_price_levels(event_id=None):
+    """
+    Recompute price levels from the resale tickets.
+
+    Returns:
+        Number of price levels written
+    """
+    try:
+        levels = ResalePriceLevel.query
+        tickets = db.session.query(
+            Ticket.event_id, Ticket.resale_price, func.count(Ticket.id)
+        ).filter(Ticket.status == 'resale', Ticket.resale_price.isnot(None))
+        if event_id is not None:
+            levels = levels.filter(ResalePriceLevel.event_id == event_id)
+            tickets = tickets.filter(Ticket.event_id == event_id)
+
+        levels.delete(synchronize_session=False)
+        rows = tickets.group_by(Ticket.event_id, Ticket.resale_price).all()
+        db.session.bulk_insert_mappings(ResalePriceLevel, [
+            {'event_id': row[0], 'price': row[1], 'listings': row[2]} for row in rows
+        ])
+        db.session.commit()
+        return len(rows)
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _median(levels, listings):
+    # Walk the sorted levels to the middle listing(s)
+    middle = [(listings - 1) // 2, listings // 2]
+    values = []
+    seen = 0
+    for price, count in levels:
+        while middle and middle[0] < seen + count:
+            values.append(price)
+            middle.pop(0)
+        seen += count
+    return sum(values) / 2
@@ -0,0 +1,221 @@
+"""
+Timed reservation holds.
+
+A hold takes seats out of sale by bumping `events.tickets_held`; no ticket
+rows are read or written until the hold is converted into a purchase. Holds
+that are neither converted nor released expire at `expires_at` and are
+returned to inventory in batches by `expire_reservations`, which runs from
+the `flask reap-reservations` command (from cron, or as a single dedicated
+process with --interval) rather than inside every web worker.
+
+A buyer may keep at most RESERVATION_MAX_ACTIVE_HOLDS holds at once, so one
+account cannot take an event's inventory out of sale by holding repeatedly.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, User, Event, Reservation
+from services.ticket_service import validate_quantity, mint_order, unavailable_error
+from services.availability_service import availability
+from services.response_cache_service import response_cache
+
+def reserve_tickets(event_id, user_id, quantity, ttl_seconds=None):
+    """Holds `quantity` seats for `ttl_seconds` (default RESERVATION_TTL_SECONDS)."""
+    if ttl_seconds is None:
+        ttl_seconds = current_app.config['RESERVATION_TTL_SECONDS']
+
+    error = validate_quantity(quantity)
+    if error:
+        return None, error
+
+    if availability.is_sold_out(event_id):
+        return None, {'error': 'No tickets available'}
+
+    event = Event.query.get(event_id)
+    if not event:
+        return None, {'error': 'Event not found'}
+
+    if event.date < datetime.utcnow():
+        return None, {'error': 'Event has already taken place'}
+
+    if event.tickets_available < quantity:
+        return None, unavailable_error(event)
+
+    try:
+        # Lock the buyer's row so concurrent holds by one user are counted one at a time
+        db.session.query(User.id).filter(User.id == user_id).with_for_update().first()
+        active = Reservation.query.filter(
+            Reservation.user_id == user_id,
+            Reservation.status == 'active',
+            Reservation.expires_at > datetime.utcnow()
+        ).count()
+        limit = current_app.config['RESERVATION_MAX_ACTIVE_HOLDS']
+        if active >= limit:
+            db.session.rollback()
+            return None, {'error': f'Cannot hold more than {limit} reservations at once'}
+
+        held = Event.query.filter(
+            Event.id == event_id,
+            Event.tickets_sold + Event.tickets_held + quantity <= Event.capacity
+        ).update({Event.tickets_held: Event.tickets_held + quantity}, synchronize_session=False)
+
+        if not held:
+            db.session.rollback()
+            return None, unavailable_error(event)
+
+        reservation = Reservation(
+            hold_id=uuid.uuid4().hex,
+            event_id=event_id,
+            user_id=user_id,
+            quantity=quantity,
+            status='active',
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        )
+        db.session.add(reservation)
+        db.session.commit()
+        response_cache.invalidate_event(event_id)
+
+        return reservation, None
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to reserve tickets: {str(e)}'}
+
+def purchase_reservation(hold_id, user_id):
+    """Converts an active hold into an order for the held seats."""
+    reservation, error = _get_own_reservation(hold_id, user_id)
+    if error:
+        return None, error
+
+    if reservation.expires_at <= datetime.utcnow():
+        return None, {'error': 'Reservation has expired'}
+
+    try:
+        # Compare-and-set so a hold is converted at most once, and never after the reaper took it
+        converted = Reservation.query.filter(
+            Reservation.id == reservation.id,
+            Reservation.status == 'active',
+            Reservation.expires_at > datetime.utcnow()
+        ).update({Reservation.status: 'converted'}, synchronize_session=False)
+
+        if not converted:
+            db.session.rollback()
+            return None, {'error': 'Reservation is no longer active'}
+
+        quantity, event_id = reservation.quantity, reservation.event_id
+        Event.query.filter(Event.id == event_id).update({
+            Event.tickets_held: Event.tickets_held - quantity,
+            Event.tickets_sold: Event.tickets_sold + quantity
+        }, synchronize_session=False)
+        last_seat = db.session.query(Event.tickets_sold).filter(Event.id == event_id).scalar()
+
+        order = mint_order(Event.query.get(event_id), user_id, quantity, last_seat)
+        reservation.order_id = order.id
+        db.session.commit()
+        response_cache.invalidate_event(event_id)
+
+        return order, None
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to purchase reservation: {str(e)}'}
+
+def release_reservation(hold_id, user_id):
+    """Gives an active hold's seats back to inventory before it expires."""
+    reservation, error = _get_own_reservation(hold_id, user_id)
+    if error:
+        return None, error
+
+    try:
+        released = Reservation.query.filter(
+            Reservation.id == reservation.id,
+            Reservation.status == 'active'
+        ).update({Reservation.status: 'released'}, synchronize_session=False)
+
+        if not released:
+            db.session.rollback()
+            return None, {'error': 'Reservation is no longer active'}
+
+        Event.query.filter(Event.id == reservation.event_id).update(
+            {Event.tickets_held: Event.tickets_held - reservation.quantity},
+            synchronize_session=False
+        )
+        db.session.commit()
+        availability.invalidate(reservation.event_id)
+        response_cache.invalidate_event(reservation.event_id)
+        db.session.refresh(reservation)
+
+        return reservation, None
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to release reservation: {str(e)}'}
+
+def expire_reservations(batch_size=500, now=None):
+    """
+    Returns lapsed holds to inventory, `batch_size` holds per transaction.
+
+    Each batch is one SELECT (row-locked with SKIP LOCKED where supported, so
+    concurrent reapers and conversions never wait on each other), one UPDATE
+    of the reservation statuses and one counter UPDATE per affected event.
+
+    Returns:
+        Number of holds expired
+    """
+    now = now or datetime.utcnow()
+    expired = 0
+
+    while True:
+        rows = db.session.query(Reservation.id, Reservation.event_id, Reservation.quantity).filter(
+            Reservation.status == 'active',
+            Reservation.expires_at <= now
+        ).order_by(Reservation.expires_at).limit(batch_size).with_for_update(skip_locked=True).all()
+
+        if not rows:
+            db.session.rollback()
+            return expired
+
+        ids = [row.id for row in rows]
+        flipped = Reservation.query.filter(
+            Reservation.id.in_(ids),
+            Reservation.status == 'active'
+        ).update({Reservation.status: 'expired'}, synchronize_session=False)
+
+        if flipped != len(ids):
+            # Another worker converted or reaped part of this batch in between; try again
+            db.session.rollback()
+            continue
+
+        held_by_event = defaultdict(int)
+        for row in rows:
+            held_by_event[row.event_id] += row.quantity
+
+        for event_id, quantity in held_by_event.items():
+            Event.query.filter(Event.id == event_id).update(
+                {Event.tickets_held: Event.tickets_held - quantity},
+                synchronize_session=False
+            )
+
+        db.session.commit()
+        for event_id in held_by_event:
+            availability.invalidate(event_id)
+            response_cache.invalidate_event(event_id)
+        expired += len(ids)
+
+def _get_own_reservation(hold_id, user_id):
+    reservation = Reservation.query.filter_by(hold_id=hold_id).first()
+    if not reservation:
+        return None, {'error': 'Reservation not found'}
+
+    if reservation.user_id != user_id:
+        return None, {'error': 'Unauthorized'}
+
+    if reservation.status != 'active':
+        return None, {'error': 'Reservation is no longer active'}
+
+    return reservation, None
@@ -0,0 +1,169 @@
+"""
+Response cache for public reads.
+
+GET /events/, GET /events/<id> and GET /tickets/available/<id> answer the
+same for every caller, so their responses are cached under the request path,
+the normalized query string and the current value of the generation
+counters they depend on:
+
+- 'events': bumped when an event is created, updated or deleted; event
+  listings depend on it
+- 'event:<id>': bumped after every committed change to that event or its
+  ticket counters; the event's detail and availability depend on it
+
+Bumping a generation makes every older key unreachable; stale entries then
+age out of the LRU. Listings carry counters (tickets_sold) that purchases do
+not invalidate, so those can lag by up to RESPONSE_CACHE_TTL_SECONDS. The
+local backend keeps generations per process, so other workers see a bump
+within the TTL; a shared backend (RESPONSE_CACHE_BACKEND) makes it
+immediate.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, request
+from werkzeug.utils import import_string
+from services.metrics_service import metrics
+
+CACHE_HEADER = 'X-Cache'
+
+
+class ResponseCacheBackend(ABC):
+    """Interface for response cache storage; all methods must be safe across threads."""
+
+    @abstractmethod
+    def get(self, key):
+        """The stored (status, headers, body) for `key`, or None."""
+
+    @abstractmethod
+    def set(self, key, response):
+        """Store (status, headers, body) under `key`."""
+
+    @abstractmethod
+    def generations(self, namespaces):
+        """Current generation of each namespace, in order (0 if never bumped)."""
+
+    @abstractmethod
+    def bump(self, namespace):
+        """Increment a namespace's generation, making keys built on the old one unreachable."""
+
+
+class LocalResponseCache(ResponseCacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=1000, ttl=10, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._generations = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, response):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, namespaces):
+        return [self._generations.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Flask extension holding the configured response cache backend."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_ENABLED', True)
+        app.config.setdefault('RESPONSE_CACHE_BACKEND', None)
+        app.config.setdefault('RESPONSE_CACHE_TTL_SECONDS', 10)
+        app.config.setdefault('RESPONSE_CACHE_MAX_ENTRIES', 1000)
+
+        backend = app.config['RESPONSE_CACHE_BACKEND']
+        if backend is None:
+            backend = LocalResponseCache(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_TTL_SECONDS'])
+        elif isinstance(backend, str):
+            backend = import_string(backend)()
+        app.extensions['response_cache'] = backend
+
+    @staticmethod
+    def backend():
+        return current_app.extensions['response_cache']
+
+    def invalidate_event(self, event_id):
+        """Call after committing a change to an event's row or its ticket counters."""
+        self.backend().bump(f'event:{event_id}')
+
+    def invalidate_event_listings(self):
+        """Call after committing a created, updated or deleted event."""
+        self.backend().bump('events')
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(namespaces):
+    """
+    Serve a public GET view from the response cache.
+
+    Args:
+        namespaces: Callable taking the view's URL arguments and returning the
+            generation namespaces the response depends on
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config['RESPONSE_CACHE_ENABLED']:
+                return view(*args, **kwargs)
+
+            backend = response_cache.backend()
+            depends_on = namespaces(**kwargs)
+            generations = ','.join(map(str, backend.generations(depends_on)))
+            # Encoded, so a value containing '&' or '=' cannot collide with another query
+            query = urlencode(sorted(request.args.items(multi=True)))
+            key = f'{request.path}?{query}#{generations}'
+
+            stored = backend.get(key)
+            metrics.cache_lookup('response', stored is not None)
+            if stored is not None:
+                status, headers, body = stored
+                response = current_app.response_class(body, status=status, headers=headers)
+                response.headers[CACHE_HEADER] = 'HIT'
+                return response.make_conditional(request)  # 304 if the stored ETag still matches
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                headers = {name: response.headers[name] for name in ('Content-Type', 'ETag') if name in response.headers}
+                backend.set(key, (200, headers, response.get_data()))
+            response.headers[CACHE_HEADER] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,79 @@
+"""
+Full-text search over events.
+
+Backed by the `search_vector` GIN index on Postgres and the `events_fts`
+FTS5 table on SQLite (both created alongside the events table, see
+models.EVENT_SEARCH_DDL). Every search term is matched as a word prefix so
+partially typed queries ("sau") still find "Sauti Sol".
+"""
+
+import re
+from sqlalchemy import Float, Integer, false, func, literal_column, text
+from models import db, Event
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(term):
+    """Split a raw search string into lowercase word tokens."""
+    return TOKEN_PATTERN.findall((term or '').lower())
+
+
+def search_events(query, term, rank=True):
+    """
+    Restrict an Event query to rows matching `term`.
+
+    Args:
+        query: Event query to filter
+        term: Raw user search string
+        rank: Order results by relevance (best match first)
+
+    Returns:
+        The filtered (and optionally ranked) query
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return query.filter(false())
+
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return _search_postgres(query, tokens, rank)
+    if dialect == 'sqlite':
+        return _search_sqlite(query, tokens, rank)
+    return _search_fallback(query, tokens)
+
+
+def _search_postgres(query, tokens, rank):
+    tsquery = func.to_tsquery('english', ' & '.join(f'{token}:*' for token in tokens))
+    vector = literal_column('events.search_vector')
+
+    query = query.filter(vector.op('@@')(tsquery))
+    if rank:
+        query = query.order_by(func.ts_rank_cd(vector, tsquery).desc(), Event.id)
+    return query
+
+
+def _search_sqlite(query, tokens, rank):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    # bm25 column weights follow the FTS5 column order: name, description, location
+    matches = text(
+        'SELECT rowid AS event_id, bm25(events_fts, 10.0, 1.0, 5.0) AS rank '
+        'FROM events_fts WHERE events_fts MATCH :match'
+    ).bindparams(match=match).columns(event_id=Integer, rank=Float).subquery('event_matches')
+
+    query = query.join(matches, matches.c.event_id == Event.id)
+    if rank:
+        # bm25() scores are negative; lower is a better match
+        query = query.order_by(matches.c.rank, Event.id)
+    return query
+
+
+def _search_fallback(query, tokens):
+    for token in tokens:
+        pattern = f'%{token}%'
+        query = query.filter(
+            Event.name.ilike(pattern) |
+            Event.description.ilike(pattern) |
+            Event.location.ilike(pattern)
+        )
+    return query
@@ -1,8 +1,55 @@
+from collections import Counter
 from datetime import datetime
-from models import db, Event, Ticket, Transaction
+from models import db, Event, Order, Ticket, Transaction
+from services.availability_service import availability
+from services.resale_stats_service import adjust_price_level
+from services.response_cache_service import response_cache
+
+MAX_TICKETS_PER_ORDER = 10
+MAX_BULK_RESALE = 50
 
 def purchase_ticket(event_id, user_id):
-    """Purchases a ticket for an event."""
+    """Purchases a single ticket for an event."""
+    order, error = purchase_tickets(event_id, user_id, 1)
+    if error:
+        return None, error
+    return order.tickets[0], None
+
+def validate_quantity(quantity):
+    """Returns an error dict if `quantity` is not a valid per-order ticket count."""
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return {'error': 'Quantity must be a positive integer'}
+
+    if quantity > MAX_TICKETS_PER_ORDER:
+        return {'error': f'Cannot purchase more than {MAX_TICKETS_PER_ORDER} tickets per order'}
+
+    return None
+
+def unavailable_error(event):
+    """Error for a request that does not fit in the remaining seats; remembers sell-outs."""
+    if event.tickets_available <= 0:
+        availability.mark_sold_out(event)
+        return {'error': 'No tickets available'}
+    return {'error': 'Not enough tickets available'}
+
+def purchase_tickets(event_id, user_id, quantity):
+    """
+    Purchases `quantity` tickets for an event as one order, all-or-nothing.
+
+    The seats are claimed with a single conditional UPDATE on the event row
+    (tickets_sold + tickets_held + quantity <= capacity), so concurrent buyers can never
+    oversell: the database serializes the increments and losers see zero rows
+    updated. The order, its tickets and their transactions are written in
+    batched inserts and committed once.
+    """
+    error = validate_quantity(quantity)
+    if error:
+        return None, error
+
+    # Known sell-outs are rejected without touching the database
+    if availability.is_sold_out(event_id):
+        return None, {'error': 'No tickets available'}
+
     event = Event.query.get(event_id)
     if not event:
         return None, {'error': 'Event not found'}
@@ -10,40 +57,92 @@ def purchase_ticket(event_id, user_id):
     if event.date < datetime.utcnow():
         return None, {'error': 'Event has already taken place'}
 
-    ticket = Ticket.query.filter_by(
-        event_id=event_id,
-        status='available'
-    ).first()
-
-    if not ticket:
-        return None, {'error': 'No tickets available'}
+    # Cheap early exit on a (possibly stale) snapshot; the claim below is authoritative
+    if event.tickets_available < quantity:
+        return None, unavailable_error(event)
 
     try:
-        ticket.status = 'sold'
-        ticket.user_id = user_id
-        ticket.purchase_date = datetime.utcnow()
-
-        transaction = Transaction(
-            ticket_id=ticket.id,
-            seller_id=event.user_id,
-            buyer_id=user_id,
-            price=ticket.price,
-            transaction_type='primary',
-            status='completed'
-        )
+        last_seat = _claim_seats(event_id, quantity)
+        if last_seat is None:
+            db.session.rollback()
+            return None, unavailable_error(event)
 
-        event.tickets_sold += 1
-
-        db.session.add(transaction)
+        order = mint_order(event, user_id, quantity, last_seat)
         db.session.commit()
+        response_cache.invalidate_event(event_id)
 
-        return ticket, None
+        return order, None
 
     except Exception as e:
         db.session.rollback()
         # In a real app, you'd want to log this error
         return None, {'error': f'Failed to purchase ticket: {str(e)}'}
 
+def mint_order(event, user_id, quantity, last_seat):
+    """
+    Writes an order, its tickets and their transactions for seats already claimed.
+
+    Seats `last_seat - quantity + 1 .. last_seat` must have been counted into
+    event.tickets_sold by the caller. The tickets are flushed in one batch and
+    the transactions inserted with a single executemany; the caller commits.
+    """
+    now = datetime.utcnow()
+    order = Order(
+        event_id=event.id,
+        user_id=user_id,
+        quantity=quantity,
+        total_price=event.price * quantity,
+        status='completed'
+    )
+    tickets = [
+        Ticket(
+            event_id=event.id,
+            user_id=user_id,
+            order=order,
+            price=event.price,
+            status='sold',
+            seat_number=seat_number,
+            purchase_date=now
+        )
+        for seat_number in range(last_seat - quantity + 1, last_seat + 1)
+    ]
+    db.session.add(order)
+    db.session.add_all(tickets)
+    db.session.flush()
+
+    db.session.bulk_insert_mappings(Transaction, [
+        {
+            'ticket_id': ticket.id,
+            'seller_id': event.user_id,
+            'buyer_id': user_id,
+            'price': ticket.price,
+            'timestamp': now,
+            'transaction_type': 'primary',
+            'status': 'completed'
+        }
+        for ticket in tickets
+    ])
+
+    return order
+
+def _claim_seats(event_id, quantity):
+    """
+    Atomically sell `quantity` seats on an event inside the current transaction.
+
+    Returns the last claimed seat number, or None if the event does not have
+    enough unsold, unheld seats left. The UPDATE takes the event row lock
+    until commit, which also makes the follow-up read of tickets_sold consistent.
+    """
+    claimed = Event.query.filter(
+        Event.id == event_id,
+        Event.tickets_sold + Event.tickets_held + quantity <= Event.capacity
+    ).update({Event.tickets_sold: Event.tickets_sold + quantity}, synchronize_session=False)
+
+    if not claimed:
+        return None
+
+    return db.session.query(Event.tickets_sold).filter(Event.id == event_id).scalar()
+
 def resell_ticket(ticket, user_id, price):
     """Puts a ticket up for resale."""
     if ticket.user_id != user_id:
@@ -56,9 +155,19 @@ def resell_ticket(ticket, user_id, price):
         return None, {'error': 'Event has already taken place'}
 
     try:
-        ticket.status = 'resale'
-        ticket.resale_price = price
+        listed = _transition_ticket(ticket.id, {'status': 'sold', 'user_id': user_id}, {
+            Ticket.status: 'resale',
+            Ticket.resale_price: price,
+            Ticket.listed_at: datetime.utcnow()
+        })
+        if not listed:
+            db.session.rollback()
+            return None, {'error': 'Ticket cannot be resold'}
+
+        event_id = ticket.event_id
+        _adjust_resale_count(event_id, price, 1)
         db.session.commit()
+        response_cache.invalidate_event(event_id)
 
         return ticket, None
 
@@ -68,7 +177,15 @@ def resell_ticket(ticket, user_id, price):
         return None, {'error': f'Failed to list ticket for resale: {str(e)}'}
 
 def purchase_resale_ticket(ticket, user_id):
-    """Purchases a resale ticket."""
+    """
+    Purchases a resale ticket.
+
+    The ticket changes hands with a compare-and-set UPDATE guarded on the
+    listing as the buyer saw it (still listed, same seller, same price), so
+    when many buyers race for one listing exactly one wins. The UPDATE is the
+    transaction's first write and the rest is a couple of inserts, so losers
+    queue behind the winner's row lock only briefly and then fail fast.
+    """
     if ticket.status != 'resale':
         return None, {'error': 'Ticket is not available for resale'}
 
@@ -78,23 +195,32 @@ def purchase_resale_ticket(ticket, user_id):
     if ticket.event.date < datetime.utcnow():
         return None, {'error': 'Event has already taken place'}
 
+    seller_id, price = ticket.user_id, ticket.resale_price
+
     try:
-        transaction = Transaction(
+        bought = _transition_ticket(ticket.id, {'status': 'resale', 'user_id': seller_id, 'resale_price': price}, {
+            Ticket.status: 'sold',
+            Ticket.user_id: user_id,
+            Ticket.purchase_date: datetime.utcnow(),
+            Ticket.resale_price: None,
+            Ticket.listed_at: None
+        })
+        if not bought:
+            db.session.rollback()
+            return None, {'error': 'Ticket is not available for resale'}
+
+        db.session.add(Transaction(
             ticket_id=ticket.id,
-            seller_id=ticket.user_id,
+            seller_id=seller_id,
             buyer_id=user_id,
-            price=ticket.resale_price,
+            price=price,
             transaction_type='resale',
             status='completed'
-        )
-
-        ticket.status = 'sold'
-        ticket.user_id = user_id
-        ticket.purchase_date = datetime.utcnow()
-        ticket.resale_price = None
-
-        db.session.add(transaction)
+        ))
+        event_id = ticket.event_id
+        _adjust_resale_count(event_id, price, -1)
         db.session.commit()
+        response_cache.invalidate_event(event_id)
 
         return ticket, None
 
@@ -111,10 +237,23 @@ def cancel_resale(ticket, user_id):
     if ticket.status != 'resale':
         return None, {'error': 'Ticket is not listed for resale'}
 
+    price = ticket.resale_price
+
     try:
-        ticket.status = 'sold'
-        ticket.resale_price = None
+        # Guarded like a purchase so a listing sold meanwhile is not "cancelled" twice
+        cancelled = _transition_ticket(ticket.id, {'status': 'resale', 'user_id': user_id, 'resale_price': price}, {
+            Ticket.status: 'sold',
+            Ticket.resale_price: None,
+            Ticket.listed_at: None
+        })
+        if not cancelled:
+            db.session.rollback()
+            return None, {'error': 'Ticket is not listed for resale'}
+
+        event_id = ticket.event_id
+        _adjust_resale_count(event_id, price, -1)
         db.session.commit()
+        response_cache.invalidate_event(event_id)
 
         return ticket, None
 
@@ -122,3 +261,134 @@ def cancel_resale(ticket, user_id):
         db.session.rollback()
         # In a real app, you'd want to log this error
         return None, {'error': f'Failed to cancel resale listing: {str(e)}'}
+
+def resell_tickets(listings, user_id):
+    """
+    Lists several of a user's tickets for resale in one transaction.
+
+    Ownership, status and event dates are checked with a single query; each
+    eligible ticket is then listed with the same compare-and-set as
+    resell_ticket and everything is committed once.
+
+    Args:
+        listings: (ticket_id, price) pairs
+
+    Returns:
+        (results, None) with one result per listing in request order, each
+        either {'ticket_id', 'status': 'resale', 'resale_price'} or
+        {'ticket_id', 'error'}; (None, error) if the batch could not be written
+    """
+    rows = _load_for_bulk([ticket_id for ticket_id, price in listings])
+    now = datetime.utcnow()
+    results = []
+    listed = Counter()
+
+    try:
+        for ticket_id, price in listings:
+            row = rows.get(ticket_id)
+            error = _bulk_ticket_error(row, user_id)
+            if not error and row.event_date < now:
+                error = 'Event has already taken place'
+            if not error and not _transition_ticket(ticket_id, {'status': 'sold', 'user_id': user_id}, {
+                Ticket.status: 'resale',
+                Ticket.resale_price: price,
+                Ticket.listed_at: now
+            }):
+                error = 'Ticket cannot be resold'
+
+            if error:
+                results.append({'ticket_id': ticket_id, 'error': error})
+                continue
+            listed[(row.event_id, price)] += 1
+            results.append({'ticket_id': ticket_id, 'status': 'resale', 'resale_price': price})
+
+        for (event_id, price), count in listed.items():
+            _adjust_resale_count(event_id, price, count)
+        db.session.commit()
+        for event_id in {event_id for event_id, price in listed}:
+            response_cache.invalidate_event(event_id)
+
+        return results, None
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to list tickets for resale: {str(e)}'}
+
+def cancel_resales(ticket_ids, user_id):
+    """
+    Cancels several of a user's resale listings in one transaction.
+
+    Returns:
+        (results, None) with one {'ticket_id', 'status': 'sold'} or
+        {'ticket_id', 'error'} per id in request order; (None, error) if the
+        batch could not be written
+    """
+    rows = _load_for_bulk(ticket_ids)
+    results = []
+    delisted = Counter()
+
+    try:
+        for ticket_id in ticket_ids:
+            row = rows.get(ticket_id)
+            error = _bulk_ticket_error(row, user_id)
+            if not error and not _transition_ticket(
+                ticket_id,
+                {'status': 'resale', 'user_id': user_id, 'resale_price': row.resale_price},
+                {Ticket.status: 'sold', Ticket.resale_price: None, Ticket.listed_at: None}
+            ):
+                error = 'Ticket is not listed for resale'
+
+            if error:
+                results.append({'ticket_id': ticket_id, 'error': error})
+                continue
+            delisted[(row.event_id, row.resale_price)] += 1
+            results.append({'ticket_id': ticket_id, 'status': 'sold'})
+
+        for (event_id, price), count in delisted.items():
+            _adjust_resale_count(event_id, price, -count)
+        db.session.commit()
+        for event_id in {event_id for event_id, price in delisted}:
+            response_cache.invalidate_event(event_id)
+
+        return results, None
+
+    except Exception as e:
+        db.session.rollback()
+        # In a real app, you'd want to log this error
+        return None, {'error': f'Failed to cancel resale listings: {str(e)}'}
+
+def _load_for_bulk(ticket_ids):
+    """Ownership and listing state for a batch of tickets, by id, in one query."""
+    rows = db.session.query(
+        Ticket.id, Ticket.user_id, Ticket.event_id, Ticket.resale_price, Event.date.label('event_date')
+    ).join(Event, Event.id == Ticket.event_id).filter(Ticket.id.in_(ticket_ids))
+    return {row.id: row for row in rows}
+
+def _bulk_ticket_error(row, user_id):
+    if row is None:
+        return 'Ticket not found'
+    if row.user_id != user_id:
+        return 'Unauthorized'
+    return None
+
+def _transition_ticket(ticket_id, expected, values):
+    """
+    Compare-and-set a ticket row: apply `values` only if its columns still equal `expected`.
+
+    Returns True if the row was updated. A loaded Ticket is stale until the
+    caller commits or rolls back, which expires it.
+    """
+    guards = [getattr(Ticket, column) == value for column, value in expected.items()]
+    updated = Ticket.query.filter(Ticket.id == ticket_id, *guards).update(values, synchronize_session=False)
+    return bool(updated)
+
+def _adjust_resale_count(event_id, price, delta):
+    """Keeps events.tickets_resale and the resale price levels in step with listings, in the current transaction."""
+    adjust_price_level(event_id, price, delta)
+    Event.query.filter(Event.id == event_id).update(
+        {Event.tickets_resale: Event.tickets_resale + delta},
+        synchronize_session=False
+    )
+    # Sold-out snapshots carry the resale count
+    availability.invalidate(event_id)
@@ -0,0 +1,387 @@
+"""
+Virtual waiting room for flash sales.
+
+While an organizer has the waiting room open for an event, buyers join a
+queue and get a position token; an admitter lets `rate` buyers per second
+through, and only admitted tokens may hit the purchase path. Admission is
+computed lazily from elapsed time on every read, so there is no background
+thread. An admission window starts when the admitter reaches the token,
+whether or not the buyer is polling at that moment.
+
+The default LocalWaitingRoomBackend serves queues from process memory,
+which is exact for a single worker only. Multi-worker deployments must
+opt into a shared backend such as DatabaseWaitingRoomBackend;
+gunicorn.conf.py refuses to start several workers without one.
+"""
+
+import math
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import case, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import import_string
+from models import db, WaitingRoomQueue, WaitingRoomEntry
+
+TOKEN_HEADER = 'X-Queue-Token'
+
+
+class WaitingRoomBackend(ABC):
+    """Interface for waiting room storage; all methods must be safe across threads."""
+
+    @abstractmethod
+    def open(self, event_id, rate, admission_window):
+        """Start queueing for an event, or retune the rate and window of an open queue."""
+
+    @abstractmethod
+    def close(self, event_id):
+        """Stop queueing and forget every token for the event."""
+
+    @abstractmethod
+    def is_open(self, event_id):
+        """Whether purchases for the event are gated."""
+
+    @abstractmethod
+    def join(self, event_id, user_id):
+        """Enqueue a buyer and return their token (the same one if they already joined)."""
+
+    @abstractmethod
+    def status(self, event_id, token):
+        """Return a status dict for `token`, or None if the token is unknown."""
+
+    @abstractmethod
+    def consume(self, event_id, token):
+        """Spend an admission once it has been used to buy."""
+
+
+def _advance(admitted_upto, next_seq, rate, elapsed):
+    # Admission never runs ahead of the queue, so an empty queue banks no capacity
+    return min(float(next_seq), admitted_upto + elapsed * rate)
+
+
+def _crossed(old_upto, new_upto):
+    """Sequence numbers admitted between two admitter positions."""
+    return range(math.ceil(old_upto), math.ceil(new_upto))
+
+
+def _admission_time(seq, upto, last_tick, rate):
+    """When the admitter, at `upto` as of `last_tick`, reached `seq`."""
+    return last_tick + (seq - upto) / rate
+
+
+def _admitted_status(user_id, admitted_at, admission_window, now):
+    remaining = admitted_at + admission_window - now
+    return {
+        'user_id': user_id,
+        'state': 'admitted' if remaining > 0 else 'expired',
+        'position': 0,
+        'admission_expires_in': max(math.ceil(remaining), 0)
+    }
+
+
+def _waiting_status(user_id, position, rate):
+    return {
+        'user_id': user_id,
+        'state': 'waiting',
+        'position': position,
+        'estimated_wait_seconds': math.ceil(position / rate)
+    }
+
+
+class _Queue:
+    def __init__(self, rate, admission_window, now):
+        self.rate = rate
+        self.admission_window = admission_window
+        self.tokens = {}  # token -> (sequence number, user_id)
+        self.users = {}  # user_id -> token
+        self.order = []  # tokens by sequence number
+        self.admitted_at = {}  # token -> time the admitter reached it
+        self.admitted_upto = 0.0  # sequence numbers below this have been admitted
+        self.last_tick = now
+
+    @property
+    def next_seq(self):
+        return len(self.order)
+
+    def tick(self, now):
+        upto = _advance(self.admitted_upto, self.next_seq, self.rate, now - self.last_tick)
+        for seq in _crossed(self.admitted_upto, upto):
+            # setdefault: a consumed admission keeps its spent time
+            self.admitted_at.setdefault(
+                self.order[seq], _admission_time(seq, self.admitted_upto, self.last_tick, self.rate)
+            )
+        self.admitted_upto = upto
+        self.last_tick = now
+
+
+class LocalWaitingRoomBackend(WaitingRoomBackend):
+    """
+    In-process backend; queues live in this worker's memory.
+
+    Only correct with a single worker: each worker would admit `rate`
+    buyers per second of its own, and tokens issued by one worker are
+    unknown to the others.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queues = {}
+
+    def open(self, event_id, rate, admission_window):
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue:
+                queue.tick(self._clock())
+                queue.rate = rate
+                queue.admission_window = admission_window
+            else:
+                self._queues[event_id] = _Queue(rate, admission_window, self._clock())
+
+    def close(self, event_id):
+        with self._lock:
+            self._queues.pop(event_id, None)
+
+    def is_open(self, event_id):
+        return event_id in self._queues
+
+    def join(self, event_id, user_id):
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue is None:
+                return None
+
+            # Bring admissions up to now first, so a new token is not admitted retroactively
+            now = self._clock()
+            queue.tick(now)
+
+            token = queue.users.get(user_id)
+            admitted_at = queue.admitted_at.get(token)
+            if admitted_at is not None and admitted_at + queue.admission_window <= now:
+                # Spent or lapsed admission: back of the line with a fresh token
+                token = None
+            if token is None:
+                token = secrets.token_urlsafe(16)
+                queue.tokens[token] = (queue.next_seq, user_id)
+                queue.users[user_id] = token
+                queue.order.append(token)
+            return token
+
+    def status(self, event_id, token):
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue is None or token not in queue.tokens:
+                return None
+
+            now = self._clock()
+            queue.tick(now)
+            seq, user_id = queue.tokens[token]
+            if seq < queue.admitted_upto:
+                return _admitted_status(user_id, queue.admitted_at[token], queue.admission_window, now)
+            return _waiting_status(user_id, seq - math.floor(queue.admitted_upto) + 1, queue.rate)
+
+    def consume(self, event_id, token):
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue and token in queue.tokens:
+                # Leave the token known (so status reports it) but past its window
+                queue.admitted_at[token] = self._clock() - queue.admission_window
+
+
+class DatabaseWaitingRoomBackend(WaitingRoomBackend):
+    """
+    Queues in the waiting_room_queues/waiting_room_entries tables, shared by
+    every worker.
+
+    Each join claims the next admission slot with one atomic UPDATE of the
+    queue's `tail` (the next free admission time, spaced 1/rate apart and
+    never in the past, so an idle queue banks nothing) and stores it on the
+    entry. A token's admission time never changes afterwards, so a status
+    poll is a primary-key read of the entry. The queue settings behind
+    is_open() are cached in this process for WAITING_ROOM_CACHE_SECONDS, so
+    ungated purchases and polls do not read the queue row. Times are
+    wall-clock seconds since all workers must agree on them.
+    """
+
+    queues = WaitingRoomQueue.__table__
+    entries = WaitingRoomEntry.__table__
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache = {}  # event_id -> (cached until, queue row or None)
+
+    def open(self, event_id, rate, admission_window):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(self.queues.insert().values(
+                    event_id=event_id, rate=rate, admission_window=admission_window, tail=0.0
+                ))
+        except IntegrityError:
+            # Already open; slots already handed out keep their times
+            with db.engine.begin() as conn:
+                conn.execute(self.queues.update().where(self.queues.c.event_id == event_id).values(
+                    rate=rate, admission_window=admission_window
+                ))
+        self._forget(event_id)
+
+    def close(self, event_id):
+        with db.engine.begin() as conn:
+            conn.execute(self.entries.delete().where(self.entries.c.event_id == event_id))
+            conn.execute(self.queues.delete().where(self.queues.c.event_id == event_id))
+        self._forget(event_id)
+
+    def is_open(self, event_id):
+        return self._queue(event_id) is not None
+
+    def join(self, event_id, user_id):
+        queue = self._queue(event_id)
+        if queue is None:
+            return None
+
+        now = self._clock()
+        with db.engine.connect() as conn:
+            entry = conn.execute(
+                select(self.entries.c.token, self.entries.c.admitted_at)
+                .where(self.entries.c.event_id == event_id, self.entries.c.user_id == user_id)
+                .order_by(self.entries.c.admitted_at.desc())
+                .limit(1)
+            ).first()
+        if entry is not None and entry.admitted_at + queue.admission_window > now:
+            return entry.token
+
+        # Spent or lapsed admission, or first visit: back of the line with a fresh token
+        admitted_at = self._claim_slot(event_id, now)
+        if admitted_at is None:
+            self._forget(event_id)
+            return None
+
+        token = secrets.token_urlsafe(16)
+        with db.engine.begin() as conn:
+            conn.execute(self.entries.insert().values(
+                token=token, event_id=event_id, user_id=user_id, admitted_at=admitted_at
+            ))
+        return token
+
+    def status(self, event_id, token):
+        queue = self._queue(event_id)
+        if queue is None:
+            return None
+
+        with db.engine.connect() as conn:
+            entry = conn.execute(
+                select(self.entries.c.user_id, self.entries.c.admitted_at)
+                .where(self.entries.c.token == token, self.entries.c.event_id == event_id)
+            ).first()
+        if entry is None:
+            return None
+
+        now = self._clock()
+        if entry.admitted_at < now:
+            return _admitted_status(entry.user_id, entry.admitted_at, queue.admission_window, now)
+        return _waiting_status(entry.user_id, math.floor((entry.admitted_at - now) * queue.rate) + 1, queue.rate)
+
+    def consume(self, event_id, token):
+        with db.engine.begin() as conn:
+            window = select(self.queues.c.admission_window).where(
+                self.queues.c.event_id == event_id
+            ).scalar_subquery()
+            conn.execute(self.entries.update().where(
+                self.entries.c.token == token, self.entries.c.event_id == event_id
+            ).values(admitted_at=self._clock() - window))
+
+    def _claim_slot(self, event_id, now):
+        """Advance the queue's tail by one slot; returns the claimed admission time (None if closed)."""
+        next_slot = self.queues.c.tail + 1.0 / self.queues.c.rate
+        # A single-statement increment, committed at once, so the row is only locked for the UPDATE
+        with db.engine.begin() as conn:
+            claimed = conn.execute(self.queues.update().where(self.queues.c.event_id == event_id).values(
+                tail=case((next_slot > now, next_slot), else_=now)
+            )).rowcount
+            if not claimed:
+                return None
+            return conn.execute(select(self.queues.c.tail).where(self.queues.c.event_id == event_id)).scalar()
+
+    def _queue(self, event_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(event_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        with db.engine.connect() as conn:
+            queue = conn.execute(
+                select(self.queues.c.rate, self.queues.c.admission_window).where(self.queues.c.event_id == event_id)
+            ).first()
+        with self._lock:
+            self._cache[event_id] = (now + current_app.config['WAITING_ROOM_CACHE_SECONDS'], queue)
+        return queue
+
+    def _forget(self, event_id):
+        with self._lock:
+            self._cache.pop(event_id, None)
+
+
+class WaitingRoom:
+    """Flask extension holding the configured waiting room backend."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('WAITING_ROOM_BACKEND', None)
+        app.config.setdefault('WAITING_ROOM_DEFAULT_RATE', 50)
+        app.config.setdefault('WAITING_ROOM_ADMISSION_WINDOW', 300)
+        app.config.setdefault('WAITING_ROOM_CACHE_SECONDS', 1.0)
+
+        backend = app.config['WAITING_ROOM_BACKEND']
+        if backend is None:
+            backend = LocalWaitingRoomBackend()
+        elif isinstance(backend, str):
+            backend = import_string(backend)()
+        app.extensions['waiting_room'] = backend
+
+    @staticmethod
+    def backend():
+        return current_app.extensions['waiting_room']
+
+
+waiting_room = WaitingRoom()
+
+
+def admission_required(view):
+    """
+    Gate a purchase route taking `event_id` behind the event's waiting room.
+
+    Does nothing when the waiting room is closed. Otherwise the request must
+    carry an admitted X-Queue-Token belonging to the caller, which is spent
+    once the purchase succeeds. Must be applied under @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        event_id = kwargs['event_id']
+        backend = waiting_room.backend()
+        if not backend.is_open(event_id):
+            return view(*args, **kwargs)
+
+        token = request.headers.get(TOKEN_HEADER)
+        status = backend.status(event_id, token) if token else None
+        if status is None or status['user_id'] != get_jwt_identity():
+            return jsonify({'error': 'Waiting room is active, join the queue first'}), 429
+        if status['state'] != 'admitted':
+            return jsonify({
+                'error': 'Not admitted yet' if status['state'] == 'waiting' else 'Admission has expired',
+                'position': status['position']
+            }), 429
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code < 400:
+            backend.consume(event_id, token)
+        return response
+
+    return wrapper
@@ -22,3 +22,68 @@ def client(app):
 def db(app):
     """A fixture to provide the database instance."""
     return sqlalchemy_db
+
+@pytest.fixture
+def auth_headers(app):
+    """Build an Authorization header for a user."""
+    from flask_jwt_extended import create_access_token
+
+    def _auth_headers(user):
+        with app.app_context():
+            token = create_access_token(identity=user.id)
+        return {'Authorization': f'Bearer {token}'}
+
+    return _auth_headers
+
+@pytest.fixture
+def make_event():
+    """
+    Create an upcoming event and its users in the current app's database.
+
+    make_event('buyer', capacity=5) adds an 'organizer' who owns the event and
+    a 'buyer', and returns (event, organizer, buyer). Keyword arguments
+    override the event's fields; pass organizer= to reuse an existing one.
+    """
+    from datetime import datetime, timedelta
+    from models import User, Event
+
+    def _make_event(*usernames, organizer=None, **fields):
+        if organizer is None:
+            usernames = ('organizer',) + usernames
+        users = [User(username=name, email=f'{name}@test.com', password='password') for name in usernames]
+        sqlalchemy_db.session.add_all(users)
+        sqlalchemy_db.session.commit()
+        if organizer is None:
+            organizer = users.pop(0)
+
+        event = Event(**{
+            'name': 'Test Event', 'location': 'Test Location', 'description': 'Test Description',
+            'date': datetime.utcnow() + timedelta(days=1), 'price': 10.0, 'capacity': 10,
+            'tickets_sold': 0, 'user_id': organizer.id, **fields
+        })
+        sqlalchemy_db.session.add(event)
+        sqlalchemy_db.session.commit()
+        return (event, organizer, *users)
+
+    return _make_event
+
+@pytest.fixture
+def capture_sql(db):
+    """Context manager collecting every SQL statement the app sends to the database."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _capture_sql():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _capture_sql
@@ -0,0 +1,46 @@
+from services.availability_service import availability
+from services.event_service import update_event
+from services.reservation_service import reserve_tickets, release_reservation
+from services.ticket_service import purchase_ticket
+from models import Event
+
+
+def test_sold_out_purchases_skip_the_database(db, client, capture_sql, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=1)
+    event_id, buyer_id = event.id, buyer.id
+
+    purchase_ticket(event_id, buyer_id)
+    ticket, error = purchase_ticket(event_id, buyer_id)
+    assert error == {'error': 'No tickets available'}
+    assert availability.is_sold_out(event_id)
+
+    with capture_sql() as statements:
+        ticket, error = purchase_ticket(event_id, buyer_id)
+        response = client.get(f'/tickets/available/{event_id}')
+
+    assert error == {'error': 'No tickets available'}
+    assert response.get_json()['available_tickets'] == 0
+    assert response.get_json()['event']['id'] == event_id
+    assert statements == []
+
+
+def test_returned_inventory_clears_sold_out(db, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=2)
+
+    reservation, error = reserve_tickets(event.id, buyer.id, 2)
+    ticket, error = purchase_ticket(event.id, buyer.id)
+    assert availability.is_sold_out(event.id)
+
+    release_reservation(reservation.hold_id, buyer.id)
+    assert not availability.is_sold_out(event.id)
+    ticket, error = purchase_ticket(event.id, buyer.id)
+    assert error is None
+
+    purchase_ticket(event.id, buyer.id)
+    purchase_ticket(event.id, buyer.id)
+    assert availability.is_sold_out(event.id)
+
+    update_event(Event.query.get(event.id), {'capacity': 3})
+    assert not availability.is_sold_out(event.id)
+    ticket, error = purchase_ticket(event.id, buyer.id)
+    assert error is None
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from services.event_service import create_event
+from services.ticket_service import purchase_ticket
+
+
+def test_matching_etag_is_answered_before_the_view(app, db, client, capture_sql, make_event):
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+    event, organizer, buyer = make_event('buyer', capacity=5)
+    event_id, buyer_id = event.id, buyer.id
+
+    etag = client.get(f'/events/{event_id}').headers['ETag']
+    with capture_sql() as statements:
+        response = client.get(f'/events/{event_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.get_data() == b''
+    assert len(statements) == 1  # the version lookup, no event load
+
+    # Counter UPDATEs change the version too
+    purchase_ticket(event_id, buyer_id)
+    response = client.get(f'/events/{event_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['tickets_sold'] == 1
+
+    assert client.get('/events/999999', headers={'If-None-Match': etag}).status_code == 404
+
+
+def test_cached_responses_keep_their_etag(db, client, capture_sql, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=5)
+
+    etag = client.get(f'/events/{event.id}').headers['ETag']
+    with capture_sql() as statements:
+        response = client.get(f'/events/{event.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['X-Cache'] == 'HIT'
+    assert statements == []
+
+
+def test_listing_etag_changes_with_any_matching_event(app, db, client, capture_sql, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=5)
+
+    etag = client.get('/events/?per_page=5').headers['ETag']
+    assert client.get('/events/?per_page=5', headers={'If-None-Match': etag}).status_code == 304
+
+    # Tagged from the page itself: a keyset page revalidates with just its range read
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+    etag = client.get('/events/?cursor=&per_page=5').headers['ETag']
+    with capture_sql() as statements:
+        response = client.get('/events/?cursor=&per_page=5', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert len(statements) == 1 and 'count(' not in statements[0].lower()
+    app.config['RESPONSE_CACHE_ENABLED'] = True
+
+    date = (datetime.utcnow() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S')
+    create_event({'name': 'Second', 'location': 'Hall', 'description': 'Another', 'date': date,
+                  'price': 5, 'capacity': 10}, buyer.id)
+    response = client.get('/events/?per_page=5', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()['events']) == 2
+
+
+def test_sold_out_availability_revalidates_without_the_database(app, db, client, capture_sql, make_event):
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+    event, organizer, buyer = make_event('buyer', capacity=1)
+    event_id = event.id
+    purchase_ticket(event_id, buyer.id)
+
+    etag = client.get(f'/tickets/available/{event_id}').headers['ETag']  # marks the event sold out
+    with capture_sql() as statements:
+        response = client.get(f'/tickets/available/{event_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert statements == []
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from models import User, Event
+
+
+def _seed_events(db, count):
+    user = User(username='organizer', email='org@test.com', password='password')
+    db.session.add(user)
+    db.session.commit()
+
+    start = datetime.utcnow() + timedelta(days=1)
+    for i in range(count):
+        db.session.add(Event(
+            name=f'Event {i}', location='Kenyatta International Convention Centre, Nairobi',
+            description='An evening of live music, food stalls and local artists. ' * 6,
+            date=start + timedelta(days=i), price=1500.0, image=f'https://img.example.com/{i}.jpg',
+            capacity=100, category='Music', user_id=user.id
+        ))
+    db.session.commit()
+
+
+def test_card_listing_loads_only_card_columns(db, client, capture_sql):
+    _seed_events(db, 10)
+
+    full = client.get('/events/?per_page=10')
+    with capture_sql() as statements:
+        cards = client.get('/events/?per_page=10&fields=card')
+
+    assert cards.status_code == 200
+    assert set(cards.get_json()['events'][0]) == {'id', 'name', 'date', 'image', 'price'}
+    assert [event['id'] for event in cards.get_json()['events']] == [event['id'] for event in full.get_json()['events']]
+    assert len(cards.get_data()) * 2 < len(full.get_data())
+
+    page_query = next(statement for statement in statements if 'LIMIT' in statement)
+    assert 'events.image' in page_query
+    assert 'events.description' not in page_query
+    assert 'events.location' not in page_query
+
+
+def test_explicit_fields_in_cursor_mode_and_detail(db, client):
+    _seed_events(db, 3)
+
+    response = client.get('/events/?cursor=&per_page=2&fields=name,price')
+    assert response.get_json()['events'] == [{'name': 'Event 0', 'price': 1500.0}, {'name': 'Event 1', 'price': 1500.0}]
+    next_page = client.get(f'/events/?cursor={response.get_json()["next_cursor"]}&per_page=2&fields=name')
+    assert next_page.get_json()['events'] == [{'name': 'Event 2'}]
+
+    event_id = client.get('/events/?fields=id').get_json()['events'][0]['id']
+    assert client.get(f'/events/{event_id}?fields=card').get_json()['name'] == 'Event 0'
+    assert client.get(f'/events/{event_id}').get_json()['description'].startswith('An evening')
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.get('/events/?fields=name,password')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown fields: password'}
+
+
+def test_row_serializer_matches_to_dict(db):
+    _seed_events(db, 2)
+    events = Event.query.order_by(Event.id).all()
+
+    for fields in (None, Event.FIELD_SETS['card'], ('created_at', 'name')):
+        serialize = Event.row_serializer(fields)
+        rows = db.session.query(*Event.projection(fields), Event.id).order_by(Event.id).all()
+        assert [serialize(row) for row in rows] == [event.to_dict(fields) for event in events]
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from services.event_service import create_event
+from services.event_service import create_event, update_event
+from services.reservation_service import reserve_tickets
 from models import User, Event, Ticket
 
 def test_create_event(app, db):
@@ -29,5 +30,41 @@ def test_create_event(app, db):
         assert new_event.name == 'Test Event'
         assert new_event.organizer.username == 'testuser'
 
-        # 5. Assert that the tickets were created correctly
-        assert Ticket.query.count() == 100
+        # 5. Assert that no tickets were minted up front; the counter is the inventory
+        assert Ticket.query.count() == 0
+        assert new_event.tickets_sold == 0
+        assert new_event.tickets_available == 100
+
+def test_update_event_capacity(app, db):
+    """Capacity can change but never drop below tickets already sold or held."""
+    with app.app_context():
+        user = User(username='testuser', email='test@test.com', password='password')
+        db.session.add(user)
+        db.session.commit()
+
+        event = Event(
+            name='Test Event', location='Test Location', description='Test Description',
+            date=datetime.utcnow() + timedelta(days=1), price=10.0, capacity=10,
+            tickets_sold=6, user_id=user.id
+        )
+        db.session.add(event)
+        db.session.commit()
+
+        updated, error = update_event(event, {'capacity': 20})
+        assert error is None
+        assert updated.tickets_available == 14
+
+        updated, error = update_event(event, {'capacity': 5})
+        assert updated is None
+        assert 'Capacity' in error['error']
+
+        # Held seats count too, and a rejected update leaves the other fields alone
+        reserve_tickets(event.id, user.id, 4)
+        updated, error = update_event(event, {'name': 'Renamed', 'capacity': 9})
+        assert error == {'error': 'Capacity cannot be less than tickets already sold or held'}
+        event = Event.query.get(event.id)
+        assert (event.name, event.capacity) == ('Test Event', 20)
+
+        updated, error = update_event(event, {'capacity': 10})
+        assert error is None
+        assert (updated.capacity, updated.tickets_available) == (10, 0)
@@ -0,0 +1,112 @@
+from services.idempotency_service import LocalIdempotencyStore, DatabaseIdempotencyStore, purge_expired_keys, NEW, PENDING, REPLAY, MISMATCH, KEY_HEADER, REPLAY_HEADER
+from services.waiting_room_service import LocalWaitingRoomBackend, TOKEN_HEADER
+from models import Order, Transaction
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_store_replays_and_expires():
+    clock = FakeClock()
+    store = LocalIdempotencyStore(max_keys=10, ttl=60, lease=5, clock=clock)
+
+    assert store.begin('k', 'body') == (NEW, None)
+    assert store.begin('k', 'body') == (PENDING, None)
+    clock.now += 4
+    store.complete('k', (201, {}, b'{}'))
+    assert store.begin('k', 'body') == (REPLAY, (201, {}, b'{}'))
+    assert store.begin('k', 'other body') == (MISMATCH, None)
+
+    clock.now += 61
+    assert store.begin('k', 'body') == (NEW, None)
+
+    # A claim whose request never finished is taken over once its lease runs out
+    assert store.begin('k', 'body') == (PENDING, None)
+    clock.now += 6
+    assert store.begin('k', 'body') == (NEW, None)
+
+
+def test_store_evicts_least_recently_used():
+    store = LocalIdempotencyStore(max_keys=2, ttl=60, clock=FakeClock())
+    for key in ('a', 'b'):
+        store.begin(key, '')
+        store.complete(key, (200, {}, b''))
+    store.begin('a', '')  # touch a
+    store.begin('c', '')
+
+    assert len(store) == 2
+    assert store.begin('a', '')[0] == REPLAY
+    assert store.begin('b', '')[0] == NEW
+
+
+def test_database_store_replays_and_expires(app, db):
+    store = DatabaseIdempotencyStore()
+
+    assert store.begin('k', 'body') == (NEW, None)
+    assert store.begin('k', 'body') == (PENDING, None)
+    store.complete('k', (201, {'Content-Type': 'application/json'}, b'{}'))
+    assert store.begin('k', 'body') == (REPLAY, (201, {'Content-Type': 'application/json'}, b'{}'))
+    assert store.begin('k', 'other body') == (MISMATCH, None)
+
+    store.abort('k')
+    assert store.begin('k', 'body') == (NEW, None)
+
+    app.config['IDEMPOTENCY_PENDING_LEASE_SECONDS'] = -1  # the worker holding 'stuck' died
+    store.begin('stuck', 'body')
+    assert store.begin('stuck', 'body') == (NEW, None)
+
+    app.config['IDEMPOTENCY_TTL_SECONDS'] = -1
+    store.complete('k', (201, {}, b'{}'))
+    assert purge_expired_keys() == 2
+
+
+def test_retried_purchase_runs_once(client, db, auth_headers, make_event):
+    event, organizer, buyer = make_event('buyer')
+
+    headers = {**auth_headers(buyer), KEY_HEADER: 'retry-me'}
+    first = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 2}, headers=headers)
+    retry = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 2}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers[REPLAY_HEADER] == 'true'
+    assert Order.query.count() == 1
+    assert Transaction.query.count() == 2
+
+    reused = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 3}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_waiting_room_rejection_is_not_replayed(client, app, db, auth_headers, make_event):
+    event, organizer, buyer = make_event('buyer')
+    clock = FakeClock()
+    app.extensions['waiting_room'] = LocalWaitingRoomBackend(clock=clock)
+    client.post(f'/waiting-room/{event.id}/open', json={'rate': 1}, headers=auth_headers(organizer))
+
+    headers = {**auth_headers(buyer), KEY_HEADER: 'after-the-queue'}
+    assert client.post(f'/tickets/purchase/{event.id}', headers=headers).status_code == 429
+
+    token = client.post(f'/waiting-room/{event.id}/join', headers=headers).get_json()['token']
+    clock.now += 1
+    response = client.post(f'/tickets/purchase/{event.id}', headers={**headers, TOKEN_HEADER: token})
+    assert response.status_code == 201
+    assert REPLAY_HEADER not in response.headers
+
+
+def test_database_store_deduplicates_purchases(client, app, db, auth_headers, make_event):
+    app.extensions['idempotency'] = DatabaseIdempotencyStore()
+    event, organizer, buyer = make_event('buyer')
+
+    headers = {**auth_headers(buyer), KEY_HEADER: 'shared-retry'}
+    first = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 2}, headers=headers)
+    retry = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 2}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers[REPLAY_HEADER] == 'true'
+    assert Order.query.count() == 1
@@ -0,0 +1,36 @@
+import logging
+from services.instrumentation_service import instrumentation, SERVER_TIMING_HEADER
+from services.ticket_service import purchase_tickets
+
+
+def test_requests_report_query_count_and_db_time(app, client, db, auth_headers, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=20)
+    purchase_tickets(event.id, buyer.id, 10)
+    headers = auth_headers(buyer)
+
+    # Off by default: timings are not for anonymous clients
+    assert SERVER_TIMING_HEADER not in client.get('/tickets/my-tickets', headers=headers).headers
+
+    app.config['SERVER_TIMING_ENABLED'] = True
+    response = client.get('/tickets/my-tickets?per_page=50', headers=headers)
+    timing = response.headers[SERVER_TIMING_HEADER]
+    assert timing.startswith('db;dur=') and 'desc="2 queries"' in timing and 'app;dur=' in timing
+
+    # Query budget for the eager-loaded listing, whatever the page size
+    stats = instrumentation.last_stats()
+    assert stats.queries == 2
+    assert 0 < stats.db_time <= stats.duration
+
+
+def test_requests_over_budget_are_logged(app, client, db, caplog, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=20)
+    app.config['REQUEST_QUERY_BUDGET'] = 1
+
+    with caplog.at_level(logging.WARNING):
+        client.get('/events/')
+        client.get(f'/tickets/available?event_ids={event.id}')
+
+    warnings = [record.getMessage() for record in caplog.records if 'over budget' in record.getMessage()]
+    assert len(warnings) == 1
+    # Page count, page rows
+    assert 'GET /events/ (events.get_events) ran 2 queries' in warnings[0]
@@ -0,0 +1,45 @@
+import json
+import pytest
+from datetime import datetime
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from services import json_provider
+from services.json_provider import OrjsonProvider
+
+PAYLOAD = {'b': [1, 2.5, None], 'a': {'when': datetime(2026, 1, 2, 3, 4, 5), 'name': 'Café'}}
+
+
+def test_app_uses_the_orjson_provider(app):
+    assert isinstance(app.json, OrjsonProvider)
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason='orjson not installed')
+def test_orjson_output_matches_stdlib(app):
+    stdlib = DefaultJSONProvider(app)
+
+    assert json.loads(app.json.dumps(PAYLOAD)) == json.loads(stdlib.dumps(PAYLOAD))
+    assert app.json.dumps(PAYLOAD).startswith('{"a":')  # keys stay sorted
+
+    with app.test_request_context():
+        response = jsonify(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert response.get_data().endswith(b'\n')
+    assert response.get_json() == json.loads(stdlib.dumps(PAYLOAD))
+    assert response.get_json()['a']['when'] == 'Fri, 02 Jan 2026 03:04:05 GMT'
+
+
+def test_falls_back_to_stdlib_without_orjson(app, monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    stdlib = DefaultJSONProvider(app)
+
+    assert app.json.dumps(PAYLOAD) == stdlib.dumps(PAYLOAD)
+    assert app.json.loads('{"a": 1}') == {'a': 1}
+    with app.test_request_context():
+        assert jsonify(PAYLOAD).get_data() == stdlib.response(PAYLOAD).get_data()
+
+
+def test_explicit_dumps_arguments_use_stdlib(app):
+    stdlib = DefaultJSONProvider(app)
+
+    for kwargs in ({'indent': 4}, {'separators': (', ', ': ')}, {'indent': 1, 'separators': (',', ':')}):
+        assert app.json.dumps(PAYLOAD, **kwargs) == stdlib.dumps(PAYLOAD, **kwargs)
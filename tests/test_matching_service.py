@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from services.matching_service import OrderBook, matching, load_book, _execute_trades, place_buy_order, cancel_buy_order
+from services.ticket_service import purchase_tickets, resell_ticket, cancel_resale
+from models import Event, BuyOrder, Ticket, Transaction
+
+
+def _seed(make_event, listings):
+    event, organizer, seller, alice, bob = make_event('seller', 'alice', 'bob')
+
+    order, error = purchase_tickets(event.id, seller.id, len(listings))
+    for ticket, price in zip(order.tickets, listings):
+        resell_ticket(ticket, seller.id, price)
+    return event, seller, alice, bob
+
+
+def test_book_uses_price_time_priority_and_skips_self_trades():
+    book = OrderBook()
+    start = datetime(2026, 1, 1)
+    book.add_ask(1, seller_id=9, price=20.0, listed_at=start)
+    book.add_ask(2, seller_id=9, price=10.0, listed_at=start + timedelta(minutes=1))
+    book.add_ask(3, seller_id=9, price=10.0, listed_at=start)
+    book.add_ask(4, seller_id=7, price=5.0, listed_at=start)
+    book.add_bid(100, user_id=7, max_price=15.0, remaining=2, created_at=start + timedelta(minutes=1))
+    book.add_bid(101, user_id=8, max_price=15.0, remaining=2, created_at=start)
+
+    trades = book.cross(limit=10)
+
+    # Oldest bid at the best price first; user 7 never buys their own ticket 4
+    assert [(trade.order_id, trade.ticket_id) for trade in trades] == [(101, 4), (101, 3), (100, 2)]
+    assert book.cross(limit=10) == []
+
+
+def test_buy_orders_fill_against_listings(db, make_event):
+    event, seller, alice, bob = _seed(make_event, [30.0, 10.0, 20.0])
+
+    order, error = place_buy_order(event.id, alice.id, 25.0, 3)
+    assert error is None
+    assert (order.filled_quantity, order.status) == (2, 'open')
+
+    owned = Ticket.query.filter_by(user_id=alice.id).all()
+    assert sorted(ticket.status for ticket in owned) == ['sold', 'sold']
+    assert sorted(t.price for t in Transaction.query.filter_by(transaction_type='resale')) == [10.0, 20.0]
+    assert Event.query.get(event.id).tickets_resale == 1
+
+    # Bob outbids for the last listing; Alice's order keeps waiting for new asks
+    order, error = place_buy_order(event.id, bob.id, 40.0, 1)
+    assert (order.filled_quantity, order.status) == (1, 'filled')
+    assert Event.query.get(event.id).tickets_resale == 0
+
+
+def test_matching_reads_orders_changed_by_other_workers(app, db, make_event):
+    event, seller, alice, bob = _seed(make_event, [10.0, 12.0])
+    order, error = place_buy_order(event.id, alice.id, 5.0, 1)
+    assert order.filled_quantity == 0
+
+    # Changes made through another process are picked up by the next match
+    withdrawn = Ticket.query.filter_by(resale_price=10.0).one()
+    cancel_resale(withdrawn, seller.id)
+    BuyOrder.query.filter_by(id=order.id).update({BuyOrder.max_price: 15.0})
+    db.session.add(BuyOrder(event_id=event.id, user_id=bob.id, max_price=50.0, quantity=1, filled_quantity=0, status='open'))
+    db.session.commit()
+
+    assert matching.match(event.id) == 1
+    assert BuyOrder.query.get(order.id).status == 'open'  # outbid by bob for the 12.0 listing
+    assert Ticket.query.filter_by(user_id=bob.id).one().purchase_date is not None
+
+    resell_ticket(Ticket.query.get(withdrawn.id), seller.id, 11.0)
+    assert matching.match(event.id) == 1
+    assert Ticket.query.get(withdrawn.id).user_id == alice.id
+    assert cancel_buy_order(order.id, alice.id) == (None, {'error': 'Buy order is not open'})
+
+
+def test_stale_trade_loses_its_race(db, make_event):
+    event, seller, alice, bob = _seed(make_event, [10.0])
+    order, error = place_buy_order(event.id, alice.id, 5.0, 1)
+    BuyOrder.query.filter_by(id=order.id).update({BuyOrder.max_price: 15.0})
+    db.session.commit()
+
+    # Built before the listing is withdrawn elsewhere: the ticket CAS fails and the order keeps its unit
+    trades = load_book(event.id).cross(10)
+    cancel_resale(Ticket.query.filter_by(resale_price=10.0).one(), seller.id)
+
+    assert _execute_trades(event.id, trades) == 0
+    assert (BuyOrder.query.get(order.id).filled_quantity, BuyOrder.query.get(order.id).status) == (0, 'open')
+    assert Transaction.query.filter_by(transaction_type='resale').count() == 0
+
+
+def test_past_events_are_not_matched(app, db, make_event):
+    event, seller, alice, bob = _seed(make_event, [10.0])
+    order, error = place_buy_order(event.id, alice.id, 5.0, 1)
+    BuyOrder.query.filter_by(id=order.id).update({BuyOrder.max_price: 15.0})
+    Event.query.filter_by(id=event.id).update({Event.date: datetime.utcnow() - timedelta(hours=1)})
+    db.session.commit()
+
+    assert load_book(event.id).cross(10) == []
+    assert matching.match(event.id) == 0
+    result = app.test_cli_runner().invoke(args=['match-resale'])
+    assert 'Executed 0 resale trade(s) across 0 event(s)' in result.output
+    assert BuyOrder.query.get(order.id).filled_quantity == 0
+
+
+def test_bid_routes(client, db, auth_headers, make_event):
+    event, seller, alice, bob = _seed(make_event, [10.0])
+    headers = auth_headers(alice)
+
+    response = client.post(f'/tickets/events/{event.id}/bids', json={'max_price': 12.0, 'quantity': 2}, headers=headers)
+    assert response.status_code == 201
+    order_id = response.get_json()['id']
+    assert response.get_json()['filled_quantity'] == 1
+
+    assert client.get(f'/tickets/bids/{order_id}', headers=headers).get_json()['status'] == 'open'
+    assert client.delete(f'/tickets/bids/{order_id}', headers=headers).get_json()['status'] == 'cancelled'
@@ -0,0 +1,67 @@
+import pytest
+from prometheus_client import CollectorRegistry, multiprocess, values
+from services.metrics_service import metrics, create_collectors
+
+
+def test_metrics_endpoint_exposes_route_histograms(client, db, make_event):
+    event_id = make_event(capacity=20)[0].id
+    for _ in range(3):
+        client.get(f'/tickets/available/{event_id}')
+    client.get('/tickets/available/999999')
+
+    with pytest.raises(RuntimeError):
+        with metrics.upstream_timer('eventbrite', 'search_events'):
+            raise RuntimeError('upstream down')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+
+    route = 'blueprint="tickets",endpoint="tickets.get_available_tickets",method="GET"'
+    assert f'ticketi_http_requests_total{{{route},status="200"}} 3.0' in body
+    assert f'ticketi_http_requests_total{{{route},status="404"}} 1.0' in body
+    assert 'ticketi_http_request_duration_seconds_bucket{blueprint="tickets",endpoint="tickets.get_available_tickets",le="+Inf",method="GET"} 4.0' in body
+    assert f'ticketi_db_statements_per_request_count{{{route}}} 4.0' in body
+    assert 'ticketi_http_requests_in_flight{blueprint="app"} 1.0' in body  # this scrape
+    assert 'ticketi_http_requests_in_flight{blueprint="tickets"} 0.0' in body
+    # Repeat reads are answered by the response cache before the sold-out check
+    assert 'ticketi_cache_lookups_total{cache="response",result="hit"} 2.0' in body
+    assert 'ticketi_cache_lookups_total{cache="sold_out",result="miss"} 2.0' in body
+    assert 'ticketi_upstream_request_duration_seconds_count{operation="search_events",outcome="error",service="eventbrite"} 1.0' in body
+    assert '# TYPE ticketi_db_pool_checkouts_total counter' in body
+
+
+def test_metrics_aggregate_worker_files(app, client, db, tmp_path, monkeypatch):
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    route = ('events', 'events.get_events', 'GET')
+
+    # Another worker's samples, written to the directory as prometheus_client does in that process
+    monkeypatch.setattr(values, 'ValueClass', values.MultiProcessValue(lambda: 999999))
+    other_worker = create_collectors(CollectorRegistry())
+    other_worker['ticketi_http_requests_total'].labels(*route, '200').inc(5)
+    other_worker['ticketi_http_requests_in_flight'].labels('events').inc(2)
+
+    monkeypatch.setattr(values, 'ValueClass', values.MultiProcessValue())
+    registry = CollectorRegistry()
+    app.extensions['metrics'] = {'registry': registry, 'collectors': create_collectors(registry)}
+
+    client.get('/events/')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'ticketi_http_requests_total{blueprint="events",endpoint="events.get_events",method="GET",status="200"} 6.0' in body
+    assert 'ticketi_http_requests_in_flight{blueprint="events"} 2.0' in body
+
+    multiprocess.mark_process_dead(999999)
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'ticketi_http_requests_total{blueprint="events",endpoint="events.get_events",method="GET",status="200"} 6.0' in body
+    assert 'ticketi_http_requests_in_flight{blueprint="events"} 0.0' in body
+
+
+def test_metrics_token(app, client):
+    app.config['METRICS_AUTH_REQUIRED'] = True
+    assert client.get('/metrics').status_code == 403
+
+    app.config['METRICS_AUTH_TOKEN'] = 'scrape-secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
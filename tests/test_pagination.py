@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta
+from services.pagination import encode_cursor, decode_cursor, keyset_paginate, InvalidCursor
+from models import User, Event
+
+
+def _seed_events(db, count):
+    user = User(username='organizer', email='org@test.com', password='password')
+    db.session.add(user)
+    db.session.commit()
+
+    start = datetime.utcnow() + timedelta(days=1)
+    for i in range(count):
+        db.session.add(Event(
+            name=f'Event {i}',
+            location='Nairobi',
+            description='Test Description',
+            # Pairs of events share a date so the id tie-breaker is exercised
+            date=start + timedelta(days=i // 2),
+            price=100.0,
+            capacity=10,
+            status='upcoming',
+            user_id=user.id
+        ))
+    db.session.commit()
+
+
+def test_cursor_round_trip():
+    date = datetime(2026, 1, 2, 3, 4, 5, 678)
+    cursor = encode_cursor([date, 42])
+    assert decode_cursor(cursor, [Event.date, Event.id]) == [date, 42]
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor('not-a-cursor', [Event.date, Event.id])
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1]), [Event.date, Event.id])
+
+
+def test_get_events_cursor_mode_walks_every_event_once(client, app, db):
+    with app.app_context():
+        _seed_events(db, 7)
+        expected = [event.id for event in Event.query.order_by(Event.date, Event.id)]
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get('/events/', query_string={'cursor': cursor, 'per_page': 3})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'total_pages' not in data
+        seen.extend(event['id'] for event in data['events'])
+        cursor = data['next_cursor']
+        assert data['has_next'] == (cursor is not None)
+
+    assert seen == expected
+
+
+def test_get_events_rejects_invalid_cursor(client):
+    response = client.get('/events/?cursor=garbage')
+    assert response.status_code == 400
+
+
+def test_get_events_offset_mode_unchanged(client, app, db):
+    with app.app_context():
+        _seed_events(db, 5)
+
+    data = client.get('/events/?page=2&per_page=2').get_json()
+    assert data['total_pages'] == 3
+    assert data['current_page'] == 2
+    assert len(data['events']) == 2
+
+
+def test_get_events_clamps_per_page(client, app, db):
+    with app.app_context():
+        _seed_events(db, 101)
+
+    for per_page in (0, -1):
+        for cursor_mode in ({'cursor': ''}, {}):
+            response = client.get('/events/', query_string={'per_page': per_page, **cursor_mode})
+            assert response.status_code == 200
+            assert len(response.get_json()['events']) == 1
+
+    data = client.get('/events/?per_page=100000').get_json()
+    assert len(data['events']) == 100
+    assert data['total_pages'] == 2
+
+    with pytest.raises(ValueError):
+        keyset_paginate(Event.query, [Event.date, Event.id], limit=0)
@@ -0,0 +1,67 @@
+import os
+import time
+import pytest
+from app import create_app
+from config import TestingConfig
+from models import db
+from services.profiler_service import PROFILE_HEADER, PROFILE_ID_HEADER, sign_token, summarize
+
+SECRET = 'profiler-secret'
+
+
+def _profiling_app(tmp_path, **settings):
+    config = type('ProfilerConfig', (TestingConfig,), {
+        'PROFILER_DIR': str(tmp_path),
+        'PROFILER_SECRET': SECRET,
+        'RESPONSE_CACHE_ENABLED': False,  # profile the views, not cache hits
+        **settings
+    })
+    return create_app(config)
+
+
+@pytest.fixture
+def profiling_app(tmp_path):
+    _app = _profiling_app(tmp_path, PROFILER_MAX_FILES=2)
+    with _app.app_context():
+        db.create_all()
+        yield _app
+        db.drop_all()
+
+
+def test_only_signed_requests_are_profiled(profiling_app, tmp_path):
+    client = profiling_app.test_client()
+
+    assert PROFILE_ID_HEADER not in client.get('/events/').headers
+    expired = sign_token(SECRET, time.time() - 1)
+    forged = sign_token('wrong-secret', time.time() + 60)
+    for token in (expired, forged, 'garbage', '².x'):
+        assert PROFILE_ID_HEADER not in client.get('/events/', headers={PROFILE_HEADER: token}).headers
+    assert os.listdir(tmp_path) == []
+
+    valid = {PROFILE_HEADER: sign_token(SECRET, time.time() + 60)}
+    names = [client.get('/events/', headers=valid).headers[PROFILE_ID_HEADER] for _ in range(3)]
+    assert all(name.endswith('-events.get_events.prof') for name in names)
+    assert sorted(os.listdir(tmp_path)) == sorted(names[1:])  # rotated down to PROFILER_MAX_FILES
+
+    cprofile_rows, sampled_rows = summarize(str(tmp_path))
+    assert any('get_events' in function for function, calls, total, cumulative in cprofile_rows)
+
+
+def test_allowlisted_endpoints_are_sampled(tmp_path):
+    app = _profiling_app(tmp_path, PROFILER_ENDPOINTS=('events.get_events',), PROFILER_MODE='sample')
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        name = client.get('/events/?per_page=50').headers[PROFILE_ID_HEADER]
+        assert name.endswith('.collapsed')
+        assert PROFILE_ID_HEADER not in client.get('/tickets/available?event_ids=1').headers
+
+        with open(os.path.join(tmp_path, name)) as f:
+            lines = f.read().splitlines()
+        assert all(line.rpartition(' ')[2].isdigit() for line in lines)
+        db.drop_all()
+
+
+def test_profiling_is_off_without_a_directory(app):
+    assert 'profile' not in str(app.before_request_funcs)
@@ -0,0 +1,101 @@
+"""
+Concurrency stress tests for the purchase paths.
+
+Fires many more parallel purchases than there are seats at a single event
+and checks that exactly `capacity` succeed, each with a distinct seat, and
+races many buyers for a single resale listing. Uses a file-backed SQLite database so every worker thread gets its own
+connection, as gunicorn workers would.
+"""
+
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from config import TestingConfig
+from models import db, Event, Ticket, Transaction
+from services.ticket_service import purchase_ticket, resell_ticket, purchase_resale_ticket
+
+CAPACITY = 250
+ATTEMPTS = 2000
+WORKERS = 32
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    class StressConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'stress.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+
+    _app = create_app(StressConfig)
+    with _app.app_context():
+        db.create_all()
+        yield _app
+        db.drop_all()
+
+
+def test_parallel_purchases_never_oversell(file_app, make_event):
+    event, organizer, buyer = make_event(
+        'buyer', name='Flash Sale', location='Nairobi', description='Sells out in seconds',
+        price=2500.0, capacity=CAPACITY
+    )
+    event_id, buyer_id = event.id, buyer.id
+
+    def attempt(_):
+        with file_app.app_context():
+            ticket, error = purchase_ticket(event_id, buyer_id)
+            return error['error'] if error else 'ok'
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        outcomes = list(pool.map(attempt, range(ATTEMPTS)))
+    elapsed = time.perf_counter() - started
+
+    print(f'\n{ATTEMPTS} purchase attempts in {elapsed:.2f}s ({ATTEMPTS / elapsed:.0f} req/s)')
+
+    assert outcomes.count('ok') == CAPACITY
+    assert set(outcomes) == {'ok', 'No tickets available'}
+
+    db.session.expire_all()
+    assert Event.query.get(event_id).tickets_sold == CAPACITY
+    assert Ticket.query.count() == CAPACITY
+    assert Transaction.query.count() == CAPACITY
+    seats = sorted(seat for (seat,) in db.session.query(Ticket.seat_number))
+    assert seats == list(range(1, CAPACITY + 1))
+
+
+RESALE_BUYERS = 64
+
+
+def test_racing_resale_buyers_get_exactly_one_sale(file_app, make_event):
+    event, organizer, seller, *buyers = make_event(
+        'seller', *(f'buyer{i}' for i in range(RESALE_BUYERS)),
+        name='Hot Resale', location='Nairobi', description='One listing, many buyers', price=2500.0
+    )
+    ticket, error = purchase_ticket(event.id, seller.id)
+    resell_ticket(ticket, seller.id, 4000.0)
+    ticket_id, event_id = ticket.id, event.id
+    buyer_ids = [buyer.id for buyer in buyers]
+
+    def attempt(buyer_id):
+        with file_app.app_context():
+            started = time.perf_counter()
+            bought, error = purchase_resale_ticket(Ticket.query.get(ticket_id), buyer_id)
+            return (error['error'] if error else 'ok'), time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(attempt, buyer_ids))
+
+    latencies = sorted(latency for outcome, latency in results)
+    print(
+        f'\n{RESALE_BUYERS} racing resale buyers: '
+        f'p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms'
+    )
+
+    outcomes = [outcome for outcome, latency in results]
+    assert outcomes.count('ok') == 1
+    assert set(outcomes) == {'ok', 'Ticket is not available for resale'}
+
+    db.session.expire_all()
+    assert Transaction.query.filter_by(transaction_type='resale').count() == 1
+    assert Event.query.get(event_id).tickets_resale == 0
+    assert Ticket.query.get(ticket_id).user_id in buyer_ids
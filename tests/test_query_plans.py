@@ -0,0 +1,111 @@
+"""
+Query-plan regression suite.
+
+Each test drives an endpoint, captures the SQL it issued and runs
+EXPLAIN QUERY PLAN on every statement. A plain `SCAN <table>` on one of the
+large tables means an index stopped being used and fails the test.
+"""
+
+import re
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from models import Event, Transaction
+
+LARGE_TABLES = ('events', 'tickets', 'transactions')
+FULL_SCAN = re.compile(r'^SCAN (%s)(?! USING)\b' % '|'.join(LARGE_TABLES))
+
+
+@contextmanager
+def captured_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(engine, statements):
+    """Return (statement, plan line) for every full scan of a large table."""
+    scans = []
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            for row in cursor.fetchall():
+                if FULL_SCAN.match(row[-1]):
+                    scans.append((statement, row[-1]))
+    finally:
+        connection.close()
+    return scans
+
+
+@pytest.fixture
+def catalogue(app, db, make_event):
+    event_, organizer, buyer = make_event(
+        'buyer', name='Sauti Sol Live', location='Nairobi', description='Afro-pop',
+        date=datetime.utcnow() + timedelta(days=10), price=2500.0, capacity=5,
+        category='Music', status='upcoming'
+    )
+
+    return {'organizer': organizer, 'buyer': buyer, 'event': event_}
+
+
+@pytest.mark.parametrize('path', [
+    '/events/',
+    '/events/?category=Music',
+    '/events/?cursor=',
+    '/events/?status=upcoming&start_date=2020-01-01',
+])
+def test_event_listing_plans(client, db, catalogue, path):
+    with captured_statements(db.engine) as statements:
+        assert client.get(path).status_code == 200
+
+    assert statements
+    assert full_scans(db.engine, statements) == []
+
+
+def test_my_events_plan(client, db, catalogue, auth_headers):
+    with captured_statements(db.engine) as statements:
+        response = client.get('/events/my-events', headers=auth_headers(catalogue['organizer']))
+        assert response.status_code == 200
+
+    assert full_scans(db.engine, statements) == []
+
+
+def test_ticket_read_plans(client, db, catalogue, auth_headers):
+    event_id = catalogue['event'].id
+    with captured_statements(db.engine) as statements:
+        assert client.get(f'/tickets/available/{event_id}').status_code == 200
+        assert client.get(f'/tickets/resale/{event_id}').status_code == 200
+        assert client.get(f'/tickets/resale/{event_id}?cursor=').status_code == 200
+        response = client.get('/tickets/my-tickets', headers=auth_headers(catalogue['buyer']))
+        assert response.status_code == 200
+
+    assert full_scans(db.engine, statements) == []
+
+
+def test_purchase_plan(client, db, catalogue, auth_headers):
+    event_id = catalogue['event'].id
+    with captured_statements(db.engine) as statements:
+        response = client.post(f'/tickets/purchase/{event_id}', headers=auth_headers(catalogue['buyer']))
+        assert response.status_code == 201
+
+    assert full_scans(db.engine, statements) == []
+    assert Transaction.query.count() == 1
+
+
+def test_detector_flags_unindexed_filter(db, catalogue):
+    """Guard against the suite silently passing: an unindexed filter must be flagged."""
+    with captured_statements(db.engine) as statements:
+        Event.query.filter(Event.price > 0).all()
+
+    assert full_scans(db.engine, statements)
@@ -0,0 +1,73 @@
+import time
+from services.reconciliation_service import reconcile_counters
+from services.ticket_service import purchase_ticket
+from models import Event, Ticket
+
+
+def _seed(make_event, count=3):
+    event, organizer, buyer = make_event('buyer', name='Event 0', location='Nairobi')
+    events = [event] + [
+        make_event(organizer=organizer, name=f'Event {i}', location='Nairobi')[0]
+        for i in range(1, count)
+    ]
+    return events, buyer
+
+
+def test_reports_and_repairs_drift(db, capture_sql, make_event):
+    events, buyer = _seed(make_event)
+    purchase_ticket(events[0].id, buyer.id)
+    purchase_ticket(events[1].id, buyer.id)
+
+    # Seed-script style drift: counter set with no tickets behind it, and a ticket with no count
+    events[1].tickets_sold = 7
+    db.session.add(Ticket(event_id=events[2].id, user_id=buyer.id, status='resale', resale_price=5.0))
+    db.session.commit()
+
+    report = reconcile_counters(chunk_size=2, repair=False)
+    assert report['events_checked'] == 3
+    assert {drift['event_id']: drift for drift in report['drifted']} == {
+        events[1].id: {'event_id': events[1].id, 'tickets_sold': {'stored': 7, 'actual': 1}},
+        events[2].id: {
+            'event_id': events[2].id,
+            'tickets_sold': {'stored': 0, 'actual': 1},
+            'tickets_resale': {'stored': 0, 'actual': 1}
+        },
+    }
+    assert Event.query.get(events[1].id).tickets_sold == 7
+
+    with capture_sql() as statements:
+        reconcile_counters(chunk_size=2)
+    aggregates = [statement for statement in statements if 'GROUP BY' in statement]
+    assert len(aggregates) == 2  # one per id chunk
+
+    db.session.expire_all()
+    assert (Event.query.get(events[1].id).tickets_sold, Event.query.get(events[2].id).tickets_resale) == (1, 1)
+    assert reconcile_counters()['drifted'] == []
+
+
+def test_incremental_run_only_checks_touched_events(db, make_event):
+    events, buyer = _seed(make_event)
+    reconcile_counters()
+
+    time.sleep(0.01)
+    purchase_ticket(events[0].id, buyer.id)
+
+    report = reconcile_counters(incremental=True)
+    assert report['events_checked'] == 1
+    assert report['drifted'] == []
+
+
+def test_dry_run_does_not_advance_the_incremental_watermark(db, make_event):
+    events, buyer = _seed(make_event)
+    reconcile_counters()
+
+    time.sleep(0.01)
+    events[1].tickets_sold = 7
+    db.session.commit()
+
+    report = reconcile_counters(incremental=True, repair=False)
+    assert report['drifted'] == [{'event_id': events[1].id, 'tickets_sold': {'stored': 7, 'actual': 0}}]
+
+    report = reconcile_counters(incremental=True)
+    assert report['events_checked'] == 1
+    assert Event.query.get(events[1].id).tickets_sold == 0
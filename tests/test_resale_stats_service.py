@@ -0,0 +1,45 @@
+from services.resale_stats_service import get_resale_stats, rebuild_price_levels
+from services.ticket_service import purchase_tickets, resell_ticket, purchase_resale_ticket, cancel_resale
+from services.matching_service import place_buy_order
+from models import ResalePriceLevel
+
+
+def _listed_event(make_event, prices):
+    event, organizer, seller, buyer = make_event('seller', 'buyer')
+
+    order, error = purchase_tickets(event.id, seller.id, len(prices))
+    for ticket, price in zip(order.tickets, prices):
+        resell_ticket(ticket, seller.id, price)
+    return event, seller, buyer, order.tickets
+
+
+def test_stats_follow_listings_without_reading_tickets(client, db, capture_sql, make_event):
+    event, seller, buyer, tickets = _listed_event(make_event, [40.0, 10.0, 20.0, 20.0, 30.0])
+    event_id = event.id
+
+    with capture_sql() as statements:
+        stats = client.get(f'/tickets/resale/{event_id}/stats').get_json()
+    assert not any('tickets' in statement for statement in statements)
+    assert stats == {
+        'event_id': event_id, 'listings': 5, 'floor_price': 10.0,
+        'median_price': 20.0, 'max_price': 40.0, 'average_price': 24.0
+    }
+
+    purchase_resale_ticket(tickets[1], buyer.id)  # the 10.0 floor
+    cancel_resale(tickets[0], seller.id)  # the 40.0 top
+    stats = get_resale_stats(event_id)
+    assert (stats['listings'], stats['floor_price'], stats['median_price'], stats['max_price']) == (3, 20.0, 20.0, 30.0)
+
+    place_buy_order(event_id, buyer.id, 25.0, 2)  # takes both 20.0 listings
+    assert get_resale_stats(event_id)['median_price'] == 30.0
+    assert ResalePriceLevel.query.count() == 1
+
+
+def test_rebuild_recovers_levels(db, make_event):
+    event, seller, buyer, tickets = _listed_event(make_event, [15.0, 25.0])
+    ResalePriceLevel.query.delete()
+    db.session.commit()
+    assert get_resale_stats(event.id)['listings'] == 0
+
+    assert rebuild_price_levels() == 2
+    assert get_resale_stats(event.id)['median_price'] == 20.0
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from services.reservation_service import reserve_tickets, purchase_reservation, release_reservation, expire_reservations
+from services.ticket_service import purchase_tickets
+from models import Event, Reservation, Ticket
+
+
+def test_hold_takes_seats_out_of_sale_then_converts(app, db, make_event):
+    with app.app_context():
+        event, organizer, buyer = make_event('buyer', capacity=5)
+
+        reservation, error = reserve_tickets(event.id, buyer.id, 3)
+        assert error is None
+        assert Event.query.get(event.id).tickets_available == 2
+        assert Ticket.query.count() == 0
+
+        # Held seats cannot be bought by anyone else
+        order, error = purchase_tickets(event.id, buyer.id, 3)
+        assert error == {'error': 'Not enough tickets available'}
+
+        order, error = purchase_reservation(reservation.hold_id, buyer.id)
+        assert error is None
+        assert [ticket.seat_number for ticket in order.tickets] == [1, 2, 3]
+
+        event = Event.query.get(event.id)
+        assert (event.tickets_sold, event.tickets_held) == (3, 0)
+        assert Reservation.query.get(reservation.id).order_id == order.id
+
+        # A hold converts at most once
+        order, error = purchase_reservation(reservation.hold_id, buyer.id)
+        assert error == {'error': 'Reservation is no longer active'}
+
+
+def test_release_returns_seats(app, db, make_event):
+    with app.app_context():
+        event, organizer, buyer = make_event('buyer', capacity=5)
+
+        reservation, error = reserve_tickets(event.id, buyer.id, 2)
+        reservation, error = release_reservation(reservation.hold_id, buyer.id)
+        assert error is None
+        assert reservation.status == 'released'
+        assert Event.query.get(event.id).tickets_held == 0
+
+
+def test_reaper_expires_lapsed_holds_in_batches(app, db, make_event):
+    with app.app_context():
+        event, organizer, buyer = make_event('buyer', capacity=10)
+
+        holds = [reserve_tickets(event.id, buyer.id, 2, ttl_seconds=60)[0] for _ in range(3)]
+        live, error = reserve_tickets(event.id, buyer.id, 1, ttl_seconds=3600)
+        assert Event.query.get(event.id).tickets_held == 7
+
+        expired = expire_reservations(batch_size=2, now=datetime.utcnow() + timedelta(minutes=5))
+        assert expired == 3
+
+        db.session.expire_all()
+        assert Event.query.get(event.id).tickets_held == 1
+        assert {Reservation.query.get(hold.id).status for hold in holds} == {'expired'}
+        assert Reservation.query.get(live.id).status == 'active'
+
+        order, error = purchase_reservation(holds[0].hold_id, buyer.id)
+        assert error == {'error': 'Reservation is no longer active'}
+
+
+def test_reservation_routes(client, db, auth_headers, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=5)
+    headers = auth_headers(buyer)
+
+    response = client.post(f'/tickets/reserve/{event.id}', json={'quantity': 2}, headers=headers)
+    assert response.status_code == 201
+    hold_id = response.get_json()['hold_id']
+
+    response = client.post(f'/tickets/reservations/{hold_id}/purchase', headers=headers)
+    assert response.status_code == 201
+    assert len(response.get_json()['ticket_ids']) == 2
+
+    response = client.delete(f'/tickets/reservations/{hold_id}', headers=headers)
+    assert response.status_code == 400
+
+
+def test_active_holds_per_buyer_are_limited(app, db, make_event):
+    app.config['RESERVATION_MAX_ACTIVE_HOLDS'] = 2
+    app.config['RESERVATION_TTL_SECONDS'] = 60
+    with app.app_context():
+        event, organizer, buyer = make_event('buyer', capacity=10)
+
+        first, error = reserve_tickets(event.id, buyer.id, 1)
+        assert first.expires_at - datetime.utcnow() <= timedelta(seconds=60)
+        reserve_tickets(event.id, buyer.id, 1)
+
+        reservation, error = reserve_tickets(event.id, buyer.id, 1)
+        assert error == {'error': 'Cannot hold more than 2 reservations at once'}
+        assert Event.query.get(event.id).tickets_held == 2
+
+        # A released hold no longer counts
+        release_reservation(first.hold_id, buyer.id)
+        reservation, error = reserve_tickets(event.id, buyer.id, 1)
+        assert error is None
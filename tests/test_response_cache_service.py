@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from services.event_service import create_event, update_event
+from services.response_cache_service import CACHE_HEADER, LocalResponseCache
+from services.ticket_service import purchase_ticket
+from models import Event
+
+
+def test_hits_skip_the_database_until_a_purchase(db, client, capture_sql, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=5)
+    event_id, buyer_id = event.id, buyer.id
+
+    first = client.get(f'/tickets/available/{event_id}')
+    assert first.headers[CACHE_HEADER] == 'MISS'
+
+    with capture_sql() as statements:
+        second = client.get(f'/tickets/available/{event_id}')
+    assert second.headers[CACHE_HEADER] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert statements == []
+
+    purchase_ticket(event_id, buyer_id)
+    third = client.get(f'/tickets/available/{event_id}')
+    assert third.headers[CACHE_HEADER] == 'MISS'
+    assert third.get_json()['available_tickets'] == 4
+
+
+def test_event_writes_invalidate_listings(db, client, make_event):
+    event, organizer, buyer = make_event('buyer', capacity=5)
+    event_id = event.id
+
+    assert client.get('/events/?per_page=5').headers[CACHE_HEADER] == 'MISS'
+    assert client.get('/events/?per_page=5').headers[CACHE_HEADER] == 'HIT'
+    assert client.get(f'/events/{event_id}').headers[CACHE_HEADER] == 'MISS'
+
+    update_event(Event.query.get(event_id), {'name': 'Renamed'})
+    response = client.get('/events/?per_page=5')
+    assert response.headers[CACHE_HEADER] == 'MISS'
+    assert response.get_json()['events'][0]['name'] == 'Renamed'
+    assert client.get(f'/events/{event_id}').get_json()['name'] == 'Renamed'
+
+    date = (datetime.utcnow() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S')
+    create_event({'name': 'Second', 'location': 'Hall', 'description': 'Another', 'date': date,
+                  'price': 5, 'capacity': 10}, buyer.id)
+    response = client.get('/events/?per_page=5')
+    assert response.headers[CACHE_HEADER] == 'MISS'
+    assert len(response.get_json()['events']) == 2
+
+
+def test_disabled_cache_always_runs_the_view(app, db, client, make_event):
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+    event, organizer, buyer = make_event('buyer', capacity=5)
+
+    client.get(f'/events/{event.id}')
+    assert CACHE_HEADER not in client.get(f'/events/{event.id}').headers
+
+
+def test_local_cache_evicts_least_recent_and_expired_entries():
+    now = [0.0]
+    cache = LocalResponseCache(max_entries=2, ttl=10, clock=lambda: now[0])
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert len(cache) == 2
+
+    now[0] = 10
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+
+    assert cache.generations(['events', 'event:1']) == [0, 0]
+    cache.bump('event:1')
+    assert cache.generations(['events', 'event:1']) == [0, 1]
+
+
+def test_encoded_query_values_do_not_share_a_key(db, client, make_event):
+    make_event('buyer', capacity=5)
+
+    smuggled = client.get('/events/?per_page=1%26search%3Dzzz')
+    assert smuggled.headers[CACHE_HEADER] == 'MISS'
+
+    response = client.get('/events/?per_page=1&search=zzz')
+    assert response.headers[CACHE_HEADER] == 'MISS'
+    assert response.get_json()['events'] == []
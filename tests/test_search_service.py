@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from services.search_service import search_events, tokenize
+from models import User, Event
+
+
+def _make_event(db, user, name, description, location):
+    event = Event(
+        name=name,
+        description=description,
+        location=location,
+        date=datetime.utcnow() + timedelta(days=7),
+        price=1000.0,
+        capacity=100,
+        user_id=user.id
+    )
+    db.session.add(event)
+    return event
+
+
+def _seed(db):
+    user = User(username='organizer', email='org@test.com', password='password')
+    db.session.add(user)
+    db.session.commit()
+
+    _make_event(db, user, 'Sauti Sol Live in Nairobi', 'Afro-pop band returns home', 'Carnivore Grounds, Nairobi')
+    _make_event(db, user, 'Nairobi Tech Summit', 'Talks on startups and cloud', 'KICC, Nairobi')
+    _make_event(db, user, 'Mombasa Food Festival', 'Coastal cuisine featuring Nairobi chefs', 'Fort Jesus, Mombasa')
+    db.session.commit()
+
+
+def test_tokenize():
+    assert tokenize('  Sauti-Sol, LIVE! ') == ['sauti', 'sol', 'live']
+    assert tokenize('') == []
+
+
+def test_search_matches_word_prefixes(app, db):
+    """Partial words match, and every term must be present."""
+    with app.app_context():
+        _seed(db)
+
+        names = [event.name for event in search_events(Event.query, 'sau').all()]
+        assert names == ['Sauti Sol Live in Nairobi']
+
+        names = [event.name for event in search_events(Event.query, 'nairobi tech').all()]
+        assert names == ['Nairobi Tech Summit']
+
+        assert search_events(Event.query, '!!!').all() == []
+
+
+def test_search_ranks_name_matches_first(app, db):
+    with app.app_context():
+        _seed(db)
+
+        names = [event.name for event in search_events(Event.query, 'nairobi').all()]
+        assert len(names) == 3
+        assert names[-1] == 'Mombasa Food Festival'
+
+
+def test_search_index_follows_updates_and_deletes(app, db):
+    with app.app_context():
+        _seed(db)
+
+        event = Event.query.filter_by(name='Nairobi Tech Summit').first()
+        event.name = 'Kisumu Tech Summit'
+        db.session.commit()
+        assert [e.id for e in search_events(Event.query, 'kisumu').all()] == [event.id]
+
+        db.session.delete(event)
+        db.session.commit()
+        assert search_events(Event.query, 'kisumu').all() == []
+
+
+def test_get_events_search(client, app, db):
+    with app.app_context():
+        _seed(db)
+
+    response = client.get('/events/?search=festival')
+    assert response.status_code == 200
+    assert [event['name'] for event in response.get_json()['events']] == ['Mombasa Food Festival']
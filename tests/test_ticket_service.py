@@ -0,0 +1,264 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm.attributes import set_committed_value
+from services.ticket_service import purchase_ticket, purchase_tickets, resell_ticket, purchase_resale_ticket, cancel_resale, MAX_TICKETS_PER_ORDER
+from services.resale_stats_service import get_resale_stats
+from models import User, Event, Order, Ticket, Transaction
+
+
+def _make_event(db, capacity=3):
+    organizer = User(username='organizer', email='org@test.com', password='password')
+    buyer = User(username='buyer', email='buyer@test.com', password='password')
+    db.session.add_all([organizer, buyer])
+    db.session.commit()
+
+    event = Event(
+        name='Test Event', location='Test Location', description='Test Description',
+        date=datetime.utcnow() + timedelta(days=1), price=10.0, capacity=capacity,
+        tickets_sold=0, user_id=organizer.id
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event, buyer
+
+
+def _make_event_for(db, organizer, capacity=3):
+    event = Event(
+        name='Other Event', location='Test Location', description='Test Description',
+        date=datetime.utcnow() + timedelta(days=2), price=20.0, capacity=capacity,
+        tickets_sold=0, user_id=organizer.id
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_purchase_mints_ticket_with_next_seat(app, db):
+    with app.app_context():
+        event, buyer = _make_event(db)
+
+        first, error = purchase_ticket(event.id, buyer.id)
+        assert error is None
+        second, error = purchase_ticket(event.id, buyer.id)
+        assert error is None
+
+        assert (first.seat_number, second.seat_number) == (1, 2)
+        assert first.status == 'sold'
+        assert first.user_id == buyer.id
+        assert Event.query.get(event.id).tickets_sold == 2
+        assert Ticket.query.count() == 2
+        assert Transaction.query.filter_by(transaction_type='primary').count() == 2
+
+
+def test_purchase_stops_at_capacity(app, db):
+    with app.app_context():
+        event, buyer = _make_event(db, capacity=1)
+
+        ticket, error = purchase_ticket(event.id, buyer.id)
+        assert error is None
+
+        ticket, error = purchase_ticket(event.id, buyer.id)
+        assert ticket is None
+        assert error == {'error': 'No tickets available'}
+        assert Ticket.query.count() == 1
+
+
+def test_purchase_multiple_tickets_as_one_order(app, db):
+    with app.app_context():
+        event, buyer = _make_event(db, capacity=10)
+
+        order, error = purchase_tickets(event.id, buyer.id, 4)
+        assert error is None
+        assert order.quantity == 4
+        assert order.total_price == 40.0
+        assert [ticket.seat_number for ticket in order.tickets] == [1, 2, 3, 4]
+        assert Transaction.query.count() == 4
+        assert Event.query.get(event.id).tickets_sold == 4
+
+
+def test_purchase_multiple_tickets_is_all_or_nothing(app, db):
+    with app.app_context():
+        event, buyer = _make_event(db, capacity=3)
+
+        order, error = purchase_tickets(event.id, buyer.id, 4)
+        assert order is None
+        assert error == {'error': 'Not enough tickets available'}
+        assert Ticket.query.count() == 0
+        assert Order.query.count() == 0
+        assert Event.query.get(event.id).tickets_sold == 0
+
+        for quantity in (0, -1, '2', MAX_TICKETS_PER_ORDER + 1):
+            order, error = purchase_tickets(event.id, buyer.id, quantity)
+            assert order is None and error
+
+
+def test_purchase_route_accepts_quantity(client, db, auth_headers):
+    event, buyer = _make_event(db, capacity=10)
+
+    response = client.post(f'/tickets/purchase/{event.id}', json={'quantity': 3}, headers=auth_headers(buyer))
+    assert response.status_code == 201
+    data = response.get_json()
+    assert len(data['ticket_ids']) == 3
+    assert data['ticket_id'] == data['ticket_ids'][0]
+
+
+def test_resale_paths_maintain_resale_counter(app, db):
+    with app.app_context():
+        event, buyer = _make_event(db, capacity=3)
+        other = User(username='other', email='other@test.com', password='password')
+        db.session.add(other)
+        db.session.commit()
+
+        first = purchase_ticket(event.id, buyer.id)[0]
+        second = purchase_ticket(event.id, buyer.id)[0]
+        resell_ticket(first, buyer.id, 15.0)
+        resell_ticket(second, buyer.id, 12.0)
+        assert Event.query.get(event.id).tickets_resale == 2
+
+        cancel_resale(second, buyer.id)
+        purchase_resale_ticket(first, other.id)
+        db.session.expire_all()
+        assert Event.query.get(event.id).tickets_resale == 0
+
+
+def test_batch_availability_is_one_query(client, db, capture_sql):
+    event, buyer = _make_event(db, capacity=3)
+    other = Event(
+        name='Other Event', location='Test Location', description='Test Description',
+        date=datetime.utcnow() + timedelta(days=1), price=10.0, capacity=5,
+        tickets_sold=5, user_id=event.user_id
+    )
+    db.session.add(other)
+    db.session.commit()
+    purchase_ticket(event.id, buyer.id)
+    url = f'/tickets/available?event_ids={event.id},{other.id},999'
+
+    with capture_sql() as statements:
+        response = client.get(url)
+
+    assert len(statements) == 1
+    availability = {row['event_id']: row['available_tickets'] for row in response.get_json()['availability']}
+    assert availability == {event.id: 2, other.id: 0}
+
+    assert client.get('/tickets/available?event_ids=1,x').status_code == 400
+
+
+def test_my_tickets_loads_events_in_one_query(client, db, auth_headers, capture_sql):
+    event, buyer = _make_event(db, capacity=5)
+    other = _make_event_for(db, event.organizer)
+    purchase_tickets(event.id, buyer.id, 3)
+    purchase_tickets(other.id, buyer.id, 2)
+    event_id, other_id, headers = event.id, other.id, auth_headers(buyer)
+
+    with capture_sql() as statements:
+        response = client.get('/tickets/my-tickets?per_page=50', headers=headers)
+    assert len(response.get_json()['tickets']) == 5
+    assert len(statements) == 2  # page count + one joined SELECT
+
+    with capture_sql() as statements:
+        response = client.get('/tickets/my-tickets?per_page=50&group_by=event', headers=headers)
+    assert len(statements) == 2
+    groups = response.get_json()['events']
+    assert [(group['event']['id'], len(group['tickets'])) for group in groups] == [(event_id, 3), (other_id, 2)]
+
+
+def test_resale_order_book_pages_by_price(client, db, capture_sql):
+    event, buyer = _make_event(db, capacity=5)
+    order, error = purchase_tickets(event.id, buyer.id, 5)
+    prices = [30.0, 10.0, 20.0, 10.0, 50.0]
+    for ticket, price in zip(order.tickets, prices):
+        resell_ticket(ticket, buyer.id, price)
+    event_id = event.id
+
+    seen = []
+    cursor = ''
+    with capture_sql() as statements:
+        while cursor is not None:
+            query_string = {'cursor': cursor, 'per_page': 2, 'max_price': 30}
+            data = client.get(f'/tickets/resale/{event_id}', query_string=query_string).get_json()
+            seen.extend(data['listings'])
+            cursor = data['next_cursor']
+
+    assert [listing['resale_price'] for listing in seen] == [10.0, 10.0, 20.0, 30.0]
+    assert {listing['seller'] for listing in seen} == {'buyer'}
+    assert len(statements) == 2  # one joined SELECT per page
+    assert client.get(f'/tickets/resale/{event_id}?cursor=bogus').status_code == 400
+
+
+def test_bulk_resale_listing_and_cancel(client, db, auth_headers, capture_sql):
+    event, buyer = _make_event(db, capacity=5)
+    order, error = purchase_tickets(event.id, buyer.id, 3)
+    mine = [ticket.id for ticket in order.tickets]
+    someone_else = User(username='other', email='other@test.com', password='password')
+    db.session.add(someone_else)
+    db.session.commit()
+    theirs = purchase_ticket(event.id, someone_else.id)[0].id
+    event_id, headers = event.id, auth_headers(buyer)
+
+    # Booleans are ints in Python but never ticket ids
+    for bad in ({'listings': [{'ticket_id': True, 'price': 15.0}]}, {'ticket_ids': [False]}):
+        url = '/tickets/resell' if 'listings' in bad else '/tickets/cancel-resale'
+        assert client.post(url, json=bad, headers=headers).status_code == 400
+
+    prices = [15.0, 15.0, 25.0]
+    listings = [{'ticket_id': ticket_id, 'price': price} for ticket_id, price in zip(mine, prices)]
+    listings.append({'ticket_id': theirs, 'price': 15.0})
+    with capture_sql() as statements:
+        response = client.post('/tickets/resell', json={'listings': listings}, headers=headers)
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['ticket_id'] for result in results] == mine + [theirs]
+    assert [result.get('error') for result in results] == [None, None, None, 'Unauthorized']
+    assert sum('FROM tickets JOIN events' in statement for statement in statements) == 1  # one ownership check
+    assert Event.query.get(event_id).tickets_resale == 3
+    stats = get_resale_stats(event_id)
+    assert (stats['listings'], stats['floor_price'], stats['max_price']) == (3, 15.0, 25.0)
+
+    response = client.post('/tickets/cancel-resale', json={'ticket_ids': mine[:2] + [999]}, headers=headers)
+    results = response.get_json()['results']
+    assert [result['ticket_id'] for result in results] == mine[:2] + [999]
+    assert [result.get('error') for result in results] == [None, None, 'Ticket not found']
+    assert Event.query.get(event_id).tickets_resale == 1
+    assert Ticket.query.get(mine[2]).status == 'resale'
+    stats = get_resale_stats(event_id)
+    assert (stats['listings'], stats['floor_price'], stats['max_price']) == (1, 25.0, 25.0)
+
+
+def test_previous_owner_cannot_relist_a_ticket(db):
+    event, buyer = _make_event(db)
+    other = User(username='other', email='other@test.com', password='password')
+    db.session.add(other)
+    db.session.commit()
+
+    ticket = purchase_ticket(event.id, buyer.id)[0]
+    resell_ticket(ticket, buyer.id, 15.0)
+    purchase_resale_ticket(ticket, other.id)
+    assert resell_ticket(ticket, buyer.id, 30.0) == (None, {'error': 'Unauthorized'})
+
+    # A seller whose session still shows them as the owner is stopped by the UPDATE's owner guard
+    set_committed_value(ticket, 'user_id', buyer.id)
+    assert resell_ticket(ticket, buyer.id, 30.0) == (None, {'error': 'Ticket cannot be resold'})
+    db.session.expire_all()
+    assert (ticket.user_id, ticket.status, ticket.resale_price) == (other.id, 'sold', None)
+    assert Event.query.get(event.id).tickets_resale == 0
+
+
+def test_resale_listing_is_a_list_unless_paginated(client, db):
+    event, buyer = _make_event(db)
+    tickets = purchase_tickets(event.id, buyer.id, 3)[0].tickets
+    for ticket, price in zip(tickets, (30.0, 10.0, 20.0)):
+        resell_ticket(ticket, buyer.id, price)
+    event_id = event.id
+
+    listings = client.get(f'/tickets/resale/{event_id}').get_json()
+    assert [listing['resale_price'] for listing in listings] == [10.0, 20.0, 30.0]
+    assert listings[0]['seller'] == 'buyer'
+    assert len(client.get(f'/tickets/resale/{event_id}?max_price=20').get_json()) == 2
+    # Without a cursor the list is capped at one page
+    capped = client.get(f'/tickets/resale/{event_id}?per_page=2').get_json()
+    assert [listing['resale_price'] for listing in capped] == [10.0, 20.0]
+
+    first = client.get(f'/tickets/resale/{event_id}?cursor=&per_page=2').get_json()
+    assert [listing['resale_price'] for listing in first['listings']] == [10.0, 20.0]
+    second = client.get(f'/tickets/resale/{event_id}?cursor={first["next_cursor"]}&per_page=2').get_json()
+    assert [listing['resale_price'] for listing in second['listings']] == [30.0]
+    assert second['has_next'] is False
@@ -0,0 +1,127 @@
+import pytest
+from services.waiting_room_service import LocalWaitingRoomBackend, DatabaseWaitingRoomBackend, TOKEN_HEADER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['local', 'database'])
+def backend(request):
+    clock = FakeClock()
+    if request.param == 'local':
+        backend = LocalWaitingRoomBackend(clock=clock)
+    else:
+        request.getfixturevalue('db')
+        backend = DatabaseWaitingRoomBackend(clock=clock)
+    backend.clock = clock
+    return backend
+
+
+def test_admits_buyers_at_configured_rate(backend):
+    clock = backend.clock
+    backend.open(1, rate=2, admission_window=60)
+
+    tokens = [backend.join(1, user_id) for user_id in range(5)]
+    assert backend.join(1, 0) == tokens[0]
+    assert [backend.status(1, token)['position'] for token in tokens] == [1, 2, 3, 4, 5]
+
+    clock.now += 1.5  # three admissions at 2/s
+    states = [backend.status(1, token)['state'] for token in tokens]
+    assert states == ['admitted', 'admitted', 'admitted', 'waiting', 'waiting']
+    assert backend.status(1, tokens[3])['position'] == 1
+
+    clock.now += 59
+    assert backend.status(1, tokens[0])['state'] == 'expired'
+    # Admitted at +2s, never polled since: the window ran from admission, not from this poll
+    assert backend.status(1, tokens[4]) == {
+        'user_id': 4, 'state': 'admitted', 'position': 0, 'admission_expires_in': 2
+    }
+    assert backend.join(1, 0) != tokens[0]
+
+
+def test_late_joiner_is_not_admitted_retroactively(backend):
+    clock = backend.clock
+    backend.open(1, rate=1, admission_window=60)
+
+    clock.now += 100  # an idle queue banks no admissions
+    token = backend.join(1, 1)
+    assert backend.status(1, token)['state'] == 'waiting'
+    clock.now += 1
+    assert backend.status(1, token)['admission_expires_in'] == 59  # admitted as it joined
+
+
+def test_spent_admission_rejoins_at_back(backend):
+    clock = backend.clock
+    backend.open(1, rate=10, admission_window=60)
+
+    token = backend.join(1, 7)
+    clock.now += 1
+    assert backend.status(1, token)['state'] == 'admitted'
+
+    backend.consume(1, token)
+    assert backend.status(1, token)['state'] == 'expired'
+    assert backend.join(1, 7) != token
+
+
+def test_closing_forgets_tokens(backend):
+    backend.open(1, rate=10, admission_window=60)
+    token = backend.join(1, 1)
+    assert backend.is_open(1)
+
+    backend.close(1)
+    assert not backend.is_open(1)
+    assert backend.status(1, token) is None
+    assert backend.join(1, 1) is None
+
+
+def test_database_backend_polls_without_touching_the_queue_row(app, db, capture_sql):
+    backend = DatabaseWaitingRoomBackend(clock=FakeClock())
+    backend.open(1, rate=10, admission_window=60)
+    token = backend.join(1, 1)
+
+    with capture_sql() as statements:
+        assert backend.is_open(1)
+        assert backend.status(1, token)['state'] == 'waiting'
+    assert len(statements) == 1 and 'waiting_room_queues' not in statements[0]  # the entry's primary-key read
+
+    with capture_sql() as statements:
+        backend.join(1, 2)
+    assert not any('FOR UPDATE' in statement for statement in statements)
+    assert sum(statement.startswith('UPDATE waiting_room_queues') for statement in statements) == 1
+
+
+def test_purchase_is_gated_while_waiting_room_open(client, app, db, auth_headers, make_event):
+    event, organizer, buyer = make_event(
+        'buyer', name='Sauti Sol Live', location='Nairobi', description='Afro-pop', price=2500.0, capacity=100
+    )
+
+    clock = FakeClock()
+    app.extensions['waiting_room'] = LocalWaitingRoomBackend(clock=clock)
+    headers = auth_headers(buyer)
+
+    response = client.post(f'/waiting-room/{event.id}/open', json={'rate': 1}, headers=auth_headers(organizer))
+    assert response.status_code == 200
+
+    assert client.post(f'/tickets/purchase/{event.id}', headers=headers).status_code == 429
+
+    token = client.post(f'/waiting-room/{event.id}/join', headers=headers).get_json()['token']
+    response = client.post(f'/tickets/purchase/{event.id}', headers={**headers, TOKEN_HEADER: token})
+    assert response.status_code == 429
+    assert response.get_json()['position'] == 1
+
+    clock.now += 1
+    assert client.get(f'/waiting-room/{event.id}/status?token={token}').get_json()['state'] == 'admitted'
+    response = client.post(f'/tickets/purchase/{event.id}', headers={**headers, TOKEN_HEADER: token})
+    assert response.status_code == 201
+
+    # The admission is spent by the purchase
+    response = client.post(f'/tickets/purchase/{event.id}', headers={**headers, TOKEN_HEADER: token})
+    assert response.status_code == 429
+
+    client.post(f'/waiting-room/{event.id}/close', headers=auth_headers(organizer))
+    assert client.post(f'/tickets/purchase/{event.id}', headers=headers).status_code == 201
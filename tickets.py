@@ -1,66 +1,208 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from models import db, Event, Ticket, Transaction, User
+from models import db, BuyOrder, Event, Ticket, Transaction, User
 from sqlalchemy import and_
-from services.ticket_service import purchase_ticket as purchase_ticket_service, resell_ticket as resell_ticket_service, purchase_resale_ticket as purchase_resale_ticket_service, cancel_resale as cancel_resale_service
+from sqlalchemy.orm import joinedload
+from services.ticket_service import purchase_tickets as purchase_tickets_service, resell_ticket as resell_ticket_service, purchase_resale_ticket as purchase_resale_ticket_service, cancel_resale as cancel_resale_service
+from services.ticket_service import resell_tickets as resell_tickets_service, cancel_resales as cancel_resales_service, MAX_BULK_RESALE
+
+from services.waiting_room_service import admission_required
+from services.idempotency_service import idempotent
+from services.availability_service import availability
+from services.pagination import keyset_paginate, InvalidCursor
+from services.resale_stats_service import get_resale_stats
+from services.response_cache_service import cached_response
+from services.etag_service import conditional, load_event_version
+from services.matching_service import matching, place_buy_order as place_buy_order_service, cancel_buy_order as cancel_buy_order_service
+from services.reservation_service import reserve_tickets as reserve_tickets_service, purchase_reservation as purchase_reservation_service, release_reservation as release_reservation_service
 
 tickets_bp = Blueprint('tickets', __name__)
 
+MAX_AVAILABILITY_BATCH = 100
+MAX_RESALE_PAGE = 100
+MAX_MY_TICKETS_PAGE = 100
+
+@tickets_bp.route('/available', methods=['GET'])
+def get_available_tickets_batch():
+    """
+    Get availability for several events in one query
+    Query params:
+        - event_ids: Comma-separated event ids (at most 100)
+    """
+    try:
+        event_ids = [int(event_id) for event_id in request.args.get('event_ids', '').split(',') if event_id.strip()]
+    except ValueError:
+        return jsonify({'error': 'event_ids must be a comma-separated list of integers'}), 400
+
+    if not event_ids:
+        return jsonify({'error': 'event_ids is required'}), 400
+    if len(event_ids) > MAX_AVAILABILITY_BATCH:
+        return jsonify({'error': f'At most {MAX_AVAILABILITY_BATCH} event_ids per request'}), 400
+
+    rows = db.session.query(
+        Event.id, Event.capacity, Event.tickets_sold, Event.tickets_held, Event.tickets_resale
+    ).filter(Event.id.in_(event_ids)).all()
+
+    return jsonify({
+        'availability': [{
+            'event_id': row.id,
+            'available_tickets': max(row.capacity - row.tickets_sold - row.tickets_held, 0),
+            'resale_tickets': row.tickets_resale
+        } for row in rows]
+    }), 200
+
 @tickets_bp.route('/available/<int:event_id>', methods=['GET'])
+@cached_response(lambda event_id: [f'event:{event_id}'])
+@conditional(lambda event_id: availability.sold_out_version(event_id) or load_event_version(event_id))
 def get_available_tickets(event_id):
-    """Get available tickets for an event"""
+    """Get available tickets for an event, served from the event's counters"""
+    sold_out = availability.sold_out_snapshot(event_id)
+    if sold_out is not None:
+        return jsonify(sold_out), 200
+
     event = Event.query.get_or_404(event_id)
-    available_tickets = Ticket.query.filter_by(
-        event_id=event_id,
-        status='available'
-    ).count()
+    if event.tickets_available <= 0:
+        availability.mark_sold_out(event)
 
     return jsonify({
         'event': event.to_dict(),
-        'available_tickets': available_tickets
+        'available_tickets': event.tickets_available,
+        'resale_tickets': event.tickets_resale
     }), 200
 
 
 
 @tickets_bp.route('/purchase/<int:event_id>', methods=['POST'])
 @jwt_required()
+@admission_required
+@idempotent
 def purchase_ticket(event_id):
-    """Purchase a ticket for an event"""
+    """Purchase one or more tickets for an event (optional JSON body: {"quantity": N})"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    order, error = purchase_tickets_service(event_id, current_user_id, data.get('quantity', 1))
+
+    if error:
+        return jsonify(error), 400
+
+    tickets = order.tickets
+    return jsonify({
+        'message': 'Ticket purchased successfully' if order.quantity == 1 else 'Tickets purchased successfully',
+        'order_id': order.id,
+        'ticket_id': tickets[0].id,
+        'ticket_ids': [ticket.id for ticket in tickets],
+        'transaction_id': tickets[0].transactions[-1].id
+    }), 201
+
+@tickets_bp.route('/reserve/<int:event_id>', methods=['POST'])
+@jwt_required()
+@admission_required
+@idempotent
+def reserve_tickets(event_id):
+    """Hold seats for an event while the buyer checks out (optional JSON body: {"quantity": N})"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    reservation, error = reserve_tickets_service(
+        event_id,
+        current_user_id,
+        data.get('quantity', 1)
+    )
+
+    if error:
+        return jsonify(error), 400
+
+    return jsonify({
+        'message': 'Tickets reserved',
+        **reservation.to_dict()
+    }), 201
+
+@tickets_bp.route('/reservations/<hold_id>/purchase', methods=['POST'])
+@jwt_required()
+@idempotent
+def purchase_reservation(hold_id):
+    """Complete the purchase of held seats"""
     current_user_id = get_jwt_identity()
 
-    ticket, error = purchase_ticket_service(event_id, current_user_id)
+    order, error = purchase_reservation_service(hold_id, current_user_id)
 
     if error:
         return jsonify(error), 400
 
     return jsonify({
-        'message': 'Ticket purchased successfully',
-        'ticket_id': ticket.id,
-        'transaction_id': ticket.transactions[-1].id
+        'message': 'Tickets purchased successfully',
+        'order_id': order.id,
+        'ticket_ids': [ticket.id for ticket in order.tickets]
     }), 201
 
+@tickets_bp.route('/reservations/<hold_id>', methods=['DELETE'])
+@jwt_required()
+@idempotent
+def release_reservation(hold_id):
+    """Give held seats back before the hold expires"""
+    current_user_id = get_jwt_identity()
+
+    reservation, error = release_reservation_service(hold_id, current_user_id)
+
+    if error:
+        return jsonify(error), 400
+
+    return jsonify({
+        'message': 'Reservation released',
+        'hold_id': reservation.hold_id
+    }), 200
+
 @tickets_bp.route('/my-tickets', methods=['GET'])
 @jwt_required()
 def get_my_tickets():
-    """Get all tickets owned by the current user"""
+    """
+    Get all tickets owned by the current user
+    Query params:
+        - page: Page number (default: 1)
+        - per_page: Items per page (default: 10, at most 100)
+        - group_by: 'event' to return each event once with its tickets nested
+    """
     page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_MY_TICKETS_PAGE)
+    group_by = request.args.get('group_by')
     current_user_id = get_jwt_identity()
-    
-    query = Ticket.query.filter_by(user_id=current_user_id)
+
+    if group_by not in (None, 'event'):
+        return jsonify({'error': "group_by must be 'event'"}), 400
+
+    # Events come back in the same joined SELECT instead of one lazy load per ticket
+    query = Ticket.query.options(joinedload(Ticket.event)).filter_by(user_id=current_user_id)
+    if group_by == 'event':
+        # Keep each event's tickets contiguous so a page splits events as little as possible
+        query = query.order_by(Ticket.event_id, Ticket.id)
+    else:
+        query = query.order_by(Ticket.id)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     tickets = pagination.items
-    
-    return jsonify({
-        'tickets': [{
+
+    def ticket_dict(ticket):
+        return {
             'ticket_id': ticket.id,
-            'event': ticket.event.to_dict(),
             'status': ticket.status,
             'purchase_date': ticket.purchase_date.isoformat() if ticket.purchase_date else None,
             'price': ticket.price,
             'resale_price': ticket.resale_price
-        } for ticket in tickets],
+        }
+
+    if group_by == 'event':
+        events = {}
+        for ticket in tickets:
+            if ticket.event_id not in events:
+                events[ticket.event_id] = {'event': ticket.event.to_dict(), 'tickets': []}
+            events[ticket.event_id]['tickets'].append(ticket_dict(ticket))
+        body = {'events': list(events.values())}
+    else:
+        body = {'tickets': [{**ticket_dict(ticket), 'event': ticket.event.to_dict()} for ticket in tickets]}
+
+    return jsonify({
+        **body,
         'total_pages': pagination.pages,
         'current_page': pagination.page,
         'has_next': pagination.has_next,
@@ -71,6 +213,7 @@ def get_my_tickets():
 
 @tickets_bp.route('/resell/<int:ticket_id>', methods=['POST'])
 @jwt_required()
+@idempotent
 def resell_ticket(ticket_id):
     """Put a ticket up for resale"""
     current_user_id = get_jwt_identity()
@@ -86,31 +229,199 @@ def resell_ticket(ticket_id):
     if error:
         return jsonify(error), 400
 
+    listed_price = resold_ticket.resale_price
+    matching.match(resold_ticket.event_id)
+
     return jsonify({
         'message': 'Ticket listed for resale',
         'ticket_id': resold_ticket.id,
-        'resale_price': resold_ticket.resale_price
+        'resale_price': listed_price,
+        'status': resold_ticket.status  # 'sold' if a waiting buy order took it straight away
+    }), 200
+
+@tickets_bp.route('/resell', methods=['POST'])
+@jwt_required()
+@idempotent
+def resell_tickets():
+    """
+    List several tickets for resale at once
+    JSON body: {"listings": [{"ticket_id": 1, "price": 2500}, ...]} (at most 50)
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    listings = data.get('listings')
+
+    if not isinstance(listings, list) or not listings:
+        return jsonify({'error': 'listings must be a non-empty list'}), 400
+    if len(listings) > MAX_BULK_RESALE:
+        return jsonify({'error': f'At most {MAX_BULK_RESALE} listings per request'}), 400
+    for listing in listings:
+        ticket_id = listing.get('ticket_id') if isinstance(listing, dict) else None
+        if not isinstance(ticket_id, int) or isinstance(ticket_id, bool):
+            return jsonify({'error': 'Each listing needs an integer ticket_id'}), 400
+        price = listing.get('price')
+        if not isinstance(price, (int, float)) or isinstance(price, bool) or price < 0:
+            return jsonify({'error': 'Invalid resale price'}), 400
+
+    results, error = resell_tickets_service(
+        [(listing['ticket_id'], listing['price']) for listing in listings],
+        current_user_id
+    )
+
+    if error:
+        return jsonify(error), 400
+
+    listed_ids = [result['ticket_id'] for result in results if 'error' not in result]
+    if listed_ids:
+        event_ids = db.session.query(Ticket.event_id).filter(Ticket.id.in_(listed_ids)).distinct()
+        for (event_id,) in event_ids.all():
+            matching.match(event_id)
+
+    return jsonify({
+        'message': f'{len(listed_ids)} of {len(results)} tickets listed for resale',
+        'results': results
+    }), 200
+
+@tickets_bp.route('/cancel-resale', methods=['POST'])
+@jwt_required()
+@idempotent
+def cancel_resales():
+    """
+    Cancel several resale listings at once
+    JSON body: {"ticket_ids": [1, 2, ...]} (at most 50)
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    ticket_ids = data.get('ticket_ids')
+
+    if not isinstance(ticket_ids, list) or not ticket_ids:
+        return jsonify({'error': 'ticket_ids must be a non-empty list'}), 400
+    if len(ticket_ids) > MAX_BULK_RESALE:
+        return jsonify({'error': f'At most {MAX_BULK_RESALE} ticket_ids per request'}), 400
+    if not all(isinstance(ticket_id, int) and not isinstance(ticket_id, bool) for ticket_id in ticket_ids):
+        return jsonify({'error': 'ticket_ids must be integers'}), 400
+
+    results, error = cancel_resales_service(ticket_ids, current_user_id)
+
+    if error:
+        return jsonify(error), 400
+
+    cancelled = sum('error' not in result for result in results)
+    return jsonify({
+        'message': f'{cancelled} of {len(results)} resale listings cancelled',
+        'results': results
     }), 200
 
 @tickets_bp.route('/resale/<int:event_id>', methods=['GET'])
 def get_resale_tickets(event_id):
-    """Get all tickets available for resale for an event"""
-    resale_tickets = Ticket.query.filter_by(
-        event_id=event_id,
-        status='resale'
-    ).all()
-    
-    return jsonify([{
-        'ticket_id': ticket.id,
-        'original_price': ticket.price,
-        'resale_price': ticket.resale_price,
-        'seller': ticket.owner.username
-    } for ticket in resale_tickets]), 200
+    """
+    Get an event's resale listings, cheapest first
+
+    Returns a JSON list of the `per_page` cheapest listings unless `cursor` is
+    passed (empty for the first page), which switches to keyset pages of
+    `per_page` listings with a `next_cursor`.
+    Query params:
+        - cursor: next_cursor from the previous page (empty for the first page)
+        - per_page: Listings returned, or per page in cursor mode (default: 20, at most 100)
+        - max_price: Only listings at or below this resale price
+    """
+    cursor = request.args.get('cursor')
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), MAX_RESALE_PAGE)
+    max_price = request.args.get('max_price', type=float)
+
+    # Sellers come back in the same joined SELECT instead of one lazy load per listing
+    query = Ticket.query.options(joinedload(Ticket.owner)).filter(
+        Ticket.event_id == event_id,
+        Ticket.status == 'resale'
+    )
+    if max_price is not None:
+        query = query.filter(Ticket.resale_price <= max_price)
+
+    def listing(ticket):
+        return {
+            'ticket_id': ticket.id,
+            'original_price': ticket.price,
+            'resale_price': ticket.resale_price,
+            'seller': ticket.owner.username
+        }
+
+    if cursor is None:
+        # The first page as a plain list; clients that need the rest follow cursors
+        resale_tickets = query.order_by(Ticket.resale_price, Ticket.id).limit(per_page).all()
+        return jsonify([listing(ticket) for ticket in resale_tickets]), 200
+
+    try:
+        resale_tickets, next_cursor = keyset_paginate(query, [Ticket.resale_price, Ticket.id], cursor, per_page)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    return jsonify({
+        'listings': [listing(ticket) for ticket in resale_tickets],
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None
+    }), 200
+
+
+
+@tickets_bp.route('/resale/<int:event_id>/stats', methods=['GET'])
+def get_resale_price_stats(event_id):
+    """Get floor, median and highest resale price and the listing count for an event"""
+    return jsonify(get_resale_stats(event_id)), 200
+
+@tickets_bp.route('/events/<int:event_id>/bids', methods=['POST'])
+@jwt_required()
+@idempotent
+def place_buy_order(event_id):
+    """Post a buy order for resale tickets (JSON body: {"max_price": P, "quantity": N})"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    max_price = data.get('max_price')
+    if not isinstance(max_price, (int, float)) or isinstance(max_price, bool) or max_price < 0:
+        return jsonify({'error': 'Invalid max price'}), 400
+
+    order, error = place_buy_order_service(event_id, current_user_id, max_price, data.get('quantity', 1))
+
+    if error:
+        return jsonify(error), 400
+
+    return jsonify({
+        'message': 'Buy order placed',
+        **order.to_dict()
+    }), 201
+
+@tickets_bp.route('/bids/<int:order_id>', methods=['GET'])
+@jwt_required()
+def get_buy_order(order_id):
+    """Get the fill status of one of the current user's buy orders"""
+    order = BuyOrder.query.get_or_404(order_id)
+    if order.user_id != get_jwt_identity():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify(order.to_dict()), 200
+
+@tickets_bp.route('/bids/<int:order_id>', methods=['DELETE'])
+@jwt_required()
+@idempotent
+def cancel_buy_order(order_id):
+    """Cancel the unfilled part of a buy order"""
+    current_user_id = get_jwt_identity()
+
+    order, error = cancel_buy_order_service(order_id, current_user_id)
+
+    if error:
+        return jsonify(error), 400
+
+    return jsonify({
+        'message': 'Buy order cancelled',
+        **order.to_dict()
+    }), 200
 
 
 
 @tickets_bp.route('/purchase-resale/<int:ticket_id>', methods=['POST'])
 @jwt_required()
+@idempotent
 def purchase_resale_ticket(ticket_id):
     """Purchase a resale ticket"""
     current_user_id = get_jwt_identity()
@@ -132,6 +443,7 @@ def purchase_resale_ticket(ticket_id):
 
 @tickets_bp.route('/cancel-resale/<int:ticket_id>', methods=['POST'])
 @jwt_required()
+@idempotent
 def cancel_resale(ticket_id):
     """Cancel a ticket's resale listing"""
     current_user_id = get_jwt_identity()
@@ -0,0 +1,91 @@
+"""
+Waiting room endpoints blueprint
+Admission queue in front of the purchase path for flash sales
+"""
+
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import Event
+from services.waiting_room_service import waiting_room
+
+waiting_room_bp = Blueprint('waiting_room', __name__)
+
+
+@waiting_room_bp.route('/<int:event_id>/open', methods=['POST'])
+@jwt_required()
+def open_waiting_room(event_id):
+    """
+    Start queueing buyers for an event (organizer only)
+    JSON body (optional):
+        - rate: Buyers admitted per second
+        - admission_window: Seconds an admitted buyer has to purchase
+    """
+    event = Event.query.get_or_404(event_id)
+    if event.user_id != get_jwt_identity():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        rate = float(data.get('rate', current_app.config['WAITING_ROOM_DEFAULT_RATE']))
+        admission_window = int(data.get('admission_window', current_app.config['WAITING_ROOM_ADMISSION_WINDOW']))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid rate or admission window'}), 400
+    if rate <= 0 or admission_window <= 0:
+        return jsonify({'error': 'Rate and admission window must be positive'}), 400
+
+    waiting_room.backend().open(event_id, rate, admission_window)
+
+    return jsonify({
+        'message': 'Waiting room opened',
+        'event_id': event_id,
+        'rate': rate,
+        'admission_window': admission_window
+    }), 200
+
+
+@waiting_room_bp.route('/<int:event_id>/close', methods=['POST'])
+@jwt_required()
+def close_waiting_room(event_id):
+    """Stop queueing; purchases for the event are ungated again (organizer only)"""
+    event = Event.query.get_or_404(event_id)
+    if event.user_id != get_jwt_identity():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    waiting_room.backend().close(event_id)
+
+    return jsonify({'message': 'Waiting room closed', 'event_id': event_id}), 200
+
+
+@waiting_room_bp.route('/<int:event_id>/join', methods=['POST'])
+@jwt_required()
+def join_waiting_room(event_id):
+    """Take a place in the queue; send the returned token as X-Queue-Token when purchasing"""
+    backend = waiting_room.backend()
+    token = backend.join(event_id, get_jwt_identity())
+    if token is None:
+        return jsonify({'error': 'No waiting room is open for this event'}), 404
+
+    return jsonify({'token': token, **_public_status(backend.status(event_id, token))}), 200
+
+
+@waiting_room_bp.route('/<int:event_id>/status', methods=['GET'])
+def get_waiting_room_status(event_id):
+    """
+    Poll queue position (served from memory by the default backend, a single
+    primary-key read with the database backend)
+    Query params:
+        - token: Token returned by /join
+    """
+    backend = waiting_room.backend()
+    if not backend.is_open(event_id):
+        return jsonify({'open': False}), 200
+
+    status = backend.status(event_id, request.args.get('token', ''))
+    if status is None:
+        return jsonify({'error': 'Unknown queue token'}), 404
+
+    return jsonify({'open': True, **_public_status(status)}), 200
+
+
+def _public_status(status):
+    return {key: value for key, value in status.items() if key != 'user_id'}